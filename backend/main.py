@@ -12,6 +12,7 @@ from models.user_models import User
 from middleware.rate_limit import rate_limit_middleware
 from services.progress_tracker import progress_tracker
 from services.database import init_database, get_database
+from services.storage import get_storage_service
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -28,6 +29,10 @@ app = FastAPI(
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on application startup"""
+    # Build the shared storage service now so the first upload doesn't pay
+    # for boto3 session and service-model loading
+    get_storage_service()
+    
     # Initialize database if DATABASE_URL is provided
     database_url = os.getenv("DATABASE_URL")
     if database_url:
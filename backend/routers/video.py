@@ -1,26 +1,61 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Request
+from fastapi.responses import FileResponse
 from typing import Optional
+from pathlib import Path
+import os
+import re
+import shutil
+import tempfile
 import time
 import uuid
 import asyncio
 
 from models.conversion_models import ConversionResponse, ConversionStatus
-from services.video_processor import VideoProcessor
+from services.video_processor import VideoProcessor, X264_PRESETS
 from services.storage import StorageService
 
 router = APIRouter()
+
 video_processor = VideoProcessor()
 storage_service = StorageService()
 
+# Outputs too large to hold in memory are kept here and served by /download
+# until they expire
+LARGE_OUTPUT_DIR = Path(tempfile.gettempdir()) / "convertallhub-video"
+LARGE_OUTPUT_TTL = 3600  # 1 hour
+_OUTPUT_NAME_RE = re.compile(r'^[0-9a-f-]{36}\.(mp4|webm|avi|mov|mkv)$', re.IGNORECASE)
+
+def _sweep_large_outputs() -> None:
+    """Delete kept outputs older than LARGE_OUTPUT_TTL"""
+    cutoff = time.time() - LARGE_OUTPUT_TTL
+    for path in LARGE_OUTPUT_DIR.glob('*'):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+def _keep_large_output(path: str, filename: str) -> None:
+    """Move an on-disk output under LARGE_OUTPUT_DIR for /download to serve"""
+    LARGE_OUTPUT_DIR.mkdir(exist_ok=True)
+    _sweep_large_outputs()
+    try:
+        shutil.move(path, LARGE_OUTPUT_DIR / filename)
+    except OSError:
+        os.unlink(path)
+        raise
+
 @router.post("/convert", response_model=ConversionResponse)
 async def convert_video_format(
+    request: Request,
     file: UploadFile = File(...),
     output_format: str = Form("mp4"),
     quality: Optional[str] = Form("medium"),
     resolution: Optional[str] = Form(None),
     fps: Optional[int] = Form(None),
     video_codec: Optional[str] = Form(None),
-    audio_codec: Optional[str] = Form(None)
+    audio_codec: Optional[str] = Form(None),
+    preset: Optional[str] = Form(None)
 ):
     """Convert video between formats using FFmpeg"""
     
@@ -36,16 +71,17 @@ async def convert_video_format(
     if quality not in ['low', 'medium', 'high']:
         raise HTTPException(status_code=400, detail="Quality must be 'low', 'medium', or 'high'")
     
+    # Validate encoder preset
+    if preset and preset not in X264_PRESETS:
+        raise HTTPException(status_code=400, detail=f"Unsupported preset. Supported: {', '.join(X264_PRESETS)}")
+    
     processing_start = time.time()
     task_id = str(uuid.uuid4())
     
     try:
-        # Read file data
-        file_data = await file.read()
-        
         # Convert video
         converted_data, metadata = await video_processor.convert_format(
-            file_data,
+            file.file,
             output_format,
             quality=quality,
             resolution=resolution,
@@ -53,12 +89,18 @@ async def convert_video_format(
             video_codec=video_codec,
             audio_codec=audio_codec,
             task_id=task_id,
-            filename=file.filename
+            filename=file.filename,
+            preset=preset
         )
         
         # Store converted video
         filename = f"{task_id}.{output_format}"
-        result_url = await storage_service.store_file(converted_data, filename)
+        if isinstance(converted_data, str):
+            # Moving and sweeping touch the disk, so keep them off the event loop
+            await asyncio.to_thread(_keep_large_output, converted_data, filename)
+            result_url = str(request.url_for("download_large_output", filename=filename))
+        else:
+            result_url = await storage_service.store_file(converted_data, filename)
         
         processing_time = time.time() - processing_start
         
@@ -66,7 +108,7 @@ async def convert_video_format(
         metadata.update({
             "input_filename": file.filename,
             "task_id": task_id,
-            "file_size_mb": round(len(converted_data) / (1024 * 1024), 2)
+            "file_size_mb": round(metadata['size'] / (1024 * 1024), 2)
         })
         
         return ConversionResponse(
@@ -88,11 +130,13 @@ async def convert_video_format(
 
 @router.post("/compress", response_model=ConversionResponse)
 async def compress_video(
+    request: Request,
     file: UploadFile = File(...),
     compression_level: str = Form("medium"),
     target_size_mb: Optional[int] = Form(None),
     max_resolution: Optional[str] = Form(None),
-    max_bitrate: Optional[str] = Form(None)
+    max_bitrate: Optional[str] = Form(None),
+    preset: Optional[str] = Form(None)
 ):
     """Compress video file using FFmpeg"""
     
@@ -103,25 +147,32 @@ async def compress_video(
     if compression_level not in ['low', 'medium', 'high']:
         raise HTTPException(status_code=400, detail="Compression level must be 'low', 'medium', or 'high'")
     
+    # Validate encoder preset
+    if preset and preset not in X264_PRESETS:
+        raise HTTPException(status_code=400, detail=f"Unsupported preset. Supported: {', '.join(X264_PRESETS)}")
+    
     processing_start = time.time()
     task_id = str(uuid.uuid4())
     
     try:
-        # Read file data
-        file_data = await file.read()
-        
         # Compress video
         compressed_data, metadata = await video_processor.compress_video(
-            file_data,
+            file.file,
             compression_level=compression_level,
             target_size_mb=target_size_mb,
             max_resolution=max_resolution,
-            max_bitrate=max_bitrate
+            max_bitrate=max_bitrate,
+            preset=preset
         )
         
         # Store compressed video
         filename = f"{task_id}.mp4"
-        result_url = await storage_service.store_file(compressed_data, filename)
+        if isinstance(compressed_data, str):
+            # Moving and sweeping touch the disk, so keep them off the event loop
+            await asyncio.to_thread(_keep_large_output, compressed_data, filename)
+            result_url = str(request.url_for("download_large_output", filename=filename))
+        else:
+            result_url = await storage_service.store_file(compressed_data, filename)
         
         processing_time = time.time() - processing_start
         
@@ -148,6 +199,22 @@ async def compress_video(
             processing_time=processing_time
         )
 
+@router.get(
+    "/download/{filename}",
+    response_class=FileResponse,
+    responses={
+        200: {"content": {"video/*": {}}, "description": "The converted or compressed video"},
+        404: {"description": "Unknown or expired output"}
+    }
+)
+async def download_large_output(filename: str):
+    """Stream a /convert or /compress output that was too large to store in memory"""
+    await asyncio.to_thread(_sweep_large_outputs)
+    path = LARGE_OUTPUT_DIR / filename
+    if not _OUTPUT_NAME_RE.match(filename) or not path.is_file():
+        raise HTTPException(status_code=404, detail="Output not found or expired")
+    return FileResponse(path, filename=filename)
+
 @router.post("/thumbnail", response_model=ConversionResponse)
 async def generate_thumbnail(
     file: UploadFile = File(...),
@@ -169,12 +236,9 @@ async def generate_thumbnail(
     task_id = str(uuid.uuid4())
     
     try:
-        # Read file data
-        file_data = await file.read()
-        
         # Generate thumbnail
         thumbnail_data, metadata = await video_processor.generate_thumbnail(
-            file_data,
+            file.file,
             timestamp=timestamp,
             width=width,
             height=height,
@@ -231,12 +295,9 @@ async def extract_frames(
     task_id = str(uuid.uuid4())
     
     try:
-        # Read file data
-        file_data = await file.read()
-        
         # Extract frames
         frames, metadata = await video_processor.extract_frames(
-            file_data,
+            file.file,
             fps=fps,
             start_time=start_time,
             duration=duration,
@@ -297,11 +358,8 @@ async def get_video_info(file: UploadFile = File(...)):
     task_id = str(uuid.uuid4())
     
     try:
-        # Read file data
-        file_data = await file.read()
-        
         # Get video info
-        info = await video_processor.get_video_info(file_data)
+        info = await video_processor.get_video_info(file.file)
         
         processing_time = time.time() - processing_start
         
@@ -26,7 +26,13 @@ class AuthService:
     - Secure token payload handling
     """
     
-    def __init__(self, secret_key: str, algorithm: str = "HS256", token_expire_days: int = 7):
+    def __init__(
+        self,
+        secret_key: str,
+        algorithm: str = "HS256",
+        token_expire_days: int = 7,
+        bcrypt_rounds: int = 12
+    ):
         """
         Initialize authentication service.
         
@@ -34,6 +40,7 @@ class AuthService:
             secret_key: Secret key for JWT signing (should be strong random string)
             algorithm: JWT signing algorithm (default: HS256)
             token_expire_days: Default token expiration in days (default: 7)
+            bcrypt_rounds: bcrypt cost factor; each step doubles hashing time (default: 12)
         """
         self.secret_key = secret_key
         self.algorithm = algorithm
@@ -43,7 +50,7 @@ class AuthService:
         self.pwd_context = CryptContext(
             schemes=["bcrypt"],
             deprecated="auto",
-            bcrypt__rounds=12  # Cost factor for bcrypt (higher = more secure but slower)
+            bcrypt__rounds=bcrypt_rounds  # Cost factor for bcrypt (higher = more secure but slower)
         )
         
         logger.info(f"AuthService initialized with algorithm={algorithm}, token_expire_days={token_expire_days}")
@@ -0,0 +1,393 @@
+import mmap
+import os
+import struct
+from datetime import datetime, timezone
+from fractions import Fraction
+from typing import Dict, Any, Optional, Tuple, Iterator
+
+# Reads the ffprobe fields VideoProcessor.get_video_info reports straight from
+# an MP4/MOV header. Only the common H.264 + AAC-LC layout is handled, and only
+# where the values are known to match ffprobe's; anything else returns None so
+# the caller falls back to ffprobe.
+
+_FORMAT_NAME = 'mov,mp4,m4a,3gp,3g2,mj2'
+_MP4_EPOCH_OFFSET = 2082844800  # Seconds from 1904-01-01 to 1970-01-01
+_LANGUAGE_UND = 0x55c4  # 'und' packed as three 5-bit letters
+
+_AAC_SAMPLE_RATES = (96000, 88200, 64000, 48000, 44100, 32000, 24000, 22050, 16000, 12000, 11025, 8000, 7350)
+_AAC_CHANNELS = (0, 1, 2, 3, 4, 5, 6, 8)
+
+# SPS profiles that carry chroma format, bit depth and scaling matrices
+_H264_HIGH_PROFILES = {100, 110, 122, 244, 44, 83, 86, 118, 128, 138, 139, 134, 135}
+_H264_SAR = (
+    (0, 1), (1, 1), (12, 11), (10, 11), (16, 11), (40, 33), (24, 11), (20, 11), (32, 11),
+    (80, 33), (18, 11), (15, 11), (64, 33), (160, 99), (4, 3), (3, 2), (2, 1)
+)
+_H264_PIX_FMTS = {1: 'yuv420p', 2: 'yuv422p'}
+
+# tkhd matrix for an unrotated track: a=d=1.0 (16.16), w=1.0 (2.30)
+_IDENTITY_MATRIX = (0x10000, 0, 0, 0, 0x10000, 0, 0, 0, 0x40000000)
+
+class _BitReader:
+    """MSB-first reader for H.264 RBSP fields"""
+
+    def __init__(self, data: bytes):
+        self.value = int.from_bytes(data, 'big')
+        self.size = len(data) * 8
+        self.pos = 0
+
+    def u(self, bits: int) -> int:
+        if self.pos + bits > self.size:
+            raise ValueError("Truncated SPS")
+        self.pos += bits
+        return (self.value >> (self.size - self.pos)) & ((1 << bits) - 1)
+
+    def ue(self) -> int:
+        zeros = 0
+        while not self.u(1):
+            zeros += 1
+            if zeros > 31:
+                raise ValueError("Invalid Exp-Golomb code")
+        return (1 << zeros) - 1 + self.u(zeros)
+
+    def se(self) -> int:
+        value = self.ue()
+        return (value + 1) // 2 if value & 1 else -(value // 2)
+
+def _boxes(data, start: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """Yield (type, payload start, box end) for the boxes in data[start:end]"""
+    pos = start
+    while pos + 8 <= end:
+        size, kind = struct.unpack_from('>I4s', data, pos)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from('>Q', data, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header or pos + size > end:
+            raise ValueError(f"Malformed {kind!r} box")
+        yield kind, pos + header, pos + size
+        pos += size
+
+def _child(data, start: int, end: int, kind: bytes) -> Optional[Tuple[int, int]]:
+    """Payload span of the first child box of the given type"""
+    return next(((s, e) for k, s, e in _boxes(data, start, end) if k == kind), None)
+
+def _children(data, start: int, end: int, path: Tuple[bytes, ...]) -> Optional[Tuple[int, int]]:
+    for kind in path:
+        span = _child(data, start, end, kind)
+        if span is None:
+            return None
+        start, end = span
+    return start, end
+
+def _parse_sps(sps: bytes) -> Optional[Dict[str, Any]]:
+    """Coded size, pixel format and aspect ratio from an H.264 SPS NAL unit"""
+    reader = _BitReader(sps[1:].replace(b'\x00\x00\x03', b'\x00\x00'))
+    profile = reader.u(8)
+    reader.u(16)  # Constraint flags and level
+    reader.ue()  # seq_parameter_set_id
+
+    chroma_format, bit_depth = 1, 8
+    if profile in _H264_HIGH_PROFILES:
+        chroma_format = reader.ue()
+        if chroma_format == 3:
+            reader.u(1)
+        bit_depth = reader.ue() + 8
+        if reader.ue() + 8 != bit_depth:
+            return None
+        reader.u(1)  # qpprime_y_zero_transform_bypass_flag
+        if reader.u(1):
+            for i in range(8 if chroma_format != 3 else 12):
+                if reader.u(1):
+                    last = next_scale = 8
+                    for _ in range(16 if i < 6 else 64):
+                        if next_scale:
+                            next_scale = (last + reader.se() + 256) % 256
+                        last = next_scale or last
+
+    reader.ue()  # log2_max_frame_num_minus4
+    poc_type = reader.ue()
+    if poc_type == 0:
+        reader.ue()
+    elif poc_type == 1:
+        reader.u(1)
+        reader.se()
+        reader.se()
+        for _ in range(reader.ue()):
+            reader.se()
+    reader.ue()  # max_num_ref_frames
+    reader.u(1)
+    width = (reader.ue() + 1) * 16
+    height_in_map_units = reader.ue() + 1
+    frame_mbs_only = reader.u(1)
+    height = height_in_map_units * 16 * (2 - frame_mbs_only)
+    if not frame_mbs_only:
+        reader.u(1)
+    reader.u(1)  # direct_8x8_inference_flag
+    if reader.u(1):
+        crop_x = 2 if chroma_format in (1, 2) else 1
+        crop_y = (2 - frame_mbs_only) * (2 if chroma_format == 1 else 1)
+        left, right, top, bottom = (reader.ue() for _ in range(4))
+        width -= crop_x * (left + right)
+        height -= crop_y * (top + bottom)
+
+    sar, full_range = (0, 1), False
+    if reader.u(1):  # vui_parameters_present_flag
+        if reader.u(1):
+            sar_idc = reader.u(8)
+            if sar_idc == 255:
+                sar = (reader.u(16), reader.u(16))
+            elif sar_idc < len(_H264_SAR):
+                sar = _H264_SAR[sar_idc]
+        if reader.u(1):
+            reader.u(1)
+        if reader.u(1):
+            reader.u(3)
+            full_range = bool(reader.u(1))
+
+    # Mono and 4:4:4 (which may be RGB) are left to ffprobe
+    pix_fmt = _H264_PIX_FMTS.get(chroma_format)
+    if pix_fmt is None:
+        return None
+    if bit_depth > 8:
+        pix_fmt = f'{pix_fmt}{bit_depth}le'
+    elif full_range:
+        pix_fmt = pix_fmt.replace('yuv', 'yuvj')
+    return {'width': width, 'height': height, 'pix_fmt': pix_fmt, 'sar': sar}
+
+def _parse_avc1(data, start: int, end: int) -> Optional[Dict[str, Any]]:
+    width, height = struct.unpack_from('>HH', data, start + 24)
+    avcc = _child(data, start + 78, end, b'avcC')
+    if avcc is None or not data[avcc[0] + 5] & 0x1f:
+        return None
+    sps_length = struct.unpack_from('>H', data, avcc[0] + 6)[0]
+    sps = _parse_sps(bytes(data[avcc[0] + 8:avcc[0] + 8 + sps_length]))
+    if sps is None or (sps['width'], sps['height']) != (width, height):
+        return None
+
+    # A pasp box overrides the SPS aspect ratio, as in ffprobe
+    sar = sps['sar']
+    pasp = _child(data, start + 78, end, b'pasp')
+    h_spacing, v_spacing = struct.unpack_from('>II', data, pasp[0]) if pasp else (0, 0)
+    if h_spacing and v_spacing:
+        sar = (h_spacing, v_spacing)
+
+    stream = {
+        'codec_type': 'video',
+        'codec_name': 'h264',
+        'width': width,
+        'height': height,
+        'pix_fmt': sps['pix_fmt'],
+        'pasp': bool(h_spacing and v_spacing)
+    }
+    if sar[0] and sar[1]:
+        dar = Fraction(width * sar[0], height * sar[1])
+        stream['display_aspect_ratio'] = f'{dar.numerator}:{dar.denominator}'
+    return stream
+
+def _read_descriptor(data, pos: int) -> Tuple[int, int, int]:
+    """(tag, payload start, payload length) of an MPEG-4 descriptor"""
+    tag = data[pos]
+    pos += 1
+    length = 0
+    for _ in range(4):
+        byte = data[pos]
+        pos += 1
+        length = (length << 7) | (byte & 0x7f)
+        if not byte & 0x80:
+            break
+    return tag, pos, length
+
+def _parse_mp4a(data, start: int, end: int) -> Optional[Dict[str, Any]]:
+    version = struct.unpack_from('>H', data, start + 8)[0]
+    children_start = {0: 28, 1: 44, 2: 64}.get(version)
+    if children_start is None:
+        return None
+    # QuickTime sound descriptions nest the esds in a wave box
+    esds = _child(data, start + children_start, end, b'esds')
+    wave = _child(data, start + children_start, end, b'wave')
+    if esds is None and wave is not None:
+        esds = _child(data, *wave, b'esds')
+    if esds is None:
+        return None
+
+    tag, pos, _ = _read_descriptor(data, esds[0] + 4)
+    if tag != 0x03:
+        return None
+    flags = data[pos + 2]
+    pos += 3
+    if flags & 0x80:  # streamDependenceFlag
+        pos += 2
+    if flags & 0x40:  # URL_Flag
+        pos += 1 + data[pos]
+    if flags & 0x20:  # OCRstreamFlag
+        pos += 2
+    tag, pos, _ = _read_descriptor(data, pos)
+    if tag != 0x04 or data[pos] != 0x40:  # MPEG-4 audio
+        return None
+    tag, pos, length = _read_descriptor(data, pos + 13)
+    if tag != 0x05 or length < 2:
+        return None
+
+    # AudioSpecificConfig; only plain AAC-LC has a fixed rate and layout
+    config = struct.unpack_from('>H', data, pos)[0]
+    object_type, rate_index, channel_config = config >> 11, (config >> 7) & 0xf, (config >> 3) & 0xf
+    if object_type != 2 or rate_index >= len(_AAC_SAMPLE_RATES) or not 0 < channel_config < len(_AAC_CHANNELS):
+        return None
+    return {
+        'codec_type': 'audio',
+        'codec_name': 'aac',
+        'channels': _AAC_CHANNELS[channel_config],
+        'sample_rate': str(_AAC_SAMPLE_RATES[rate_index])
+    }
+
+def _parse_trak(data, start: int, end: int) -> Optional[Dict[str, Any]]:
+    tkhd = _child(data, start, end, b'tkhd')
+    mdhd = _children(data, start, end, (b'mdia', b'mdhd'))
+    hdlr = _children(data, start, end, (b'mdia', b'hdlr'))
+    stbl = _children(data, start, end, (b'mdia', b'minf', b'stbl'))
+    if None in (tkhd, mdhd, hdlr, stbl):
+        return None
+    handler = bytes(data[hdlr[0] + 8:hdlr[0] + 12])
+    if handler not in (b'vide', b'soun'):
+        return {}  # Timecode, subtitle and other tracks aren't reported
+
+    stsd = _child(data, stbl[0], stbl[1], b'stsd')
+    if stsd is None or struct.unpack_from('>I', data, stsd[0] + 4)[0] != 1:
+        return None
+    kind, entry_start, entry_end = next(_boxes(data, stsd[0] + 8, stsd[1]))
+
+    if handler == b'soun':
+        return _parse_mp4a(data, entry_start, entry_end) if kind == b'mp4a' else None
+    if kind != b'avc1':
+        return None
+    stream = _parse_avc1(data, entry_start, entry_end)
+    if stream is None:
+        return None
+
+    # A rotation matrix, or a display size that implies an aspect ratio the
+    # sample entry doesn't state, changes what ffprobe reports
+    matrix_at = tkhd[0] + (52 if data[tkhd[0]] == 1 else 40)
+    if struct.unpack_from('>9I', data, matrix_at) != _IDENTITY_MATRIX:
+        return None
+    display_size = struct.unpack_from('>II', data, matrix_at + 36)
+    if not stream.pop('pasp') and display_size != (stream['width'] << 16, stream['height'] << 16):
+        return None
+
+    # A constant sample delta gives the frame rate ffprobe reports
+    stts = _child(data, stbl[0], stbl[1], b'stts')
+    if stts is None:
+        return None
+    entries = struct.unpack_from('>I', data, stts[0] + 4)[0]
+    if entries == 2 and struct.unpack_from('>I', data, stts[0] + 16)[0] != 1:
+        return None
+    if entries not in (1, 2):
+        return None
+    sample_delta = struct.unpack_from('>I', data, stts[0] + 12)[0]
+    timescale = struct.unpack_from('>I', data, mdhd[0] + (20 if data[mdhd[0]] == 1 else 12))[0]
+    if not sample_delta or not timescale:
+        return None
+    frame_rate = Fraction(timescale, sample_delta)
+    stream['r_frame_rate'] = f'{frame_rate.numerator}/{frame_rate.denominator}'
+    return stream
+
+def _parse_udta(data, start: int, end: int) -> Optional[Dict[str, str]]:
+    """The encoder tag; any other user data is left to ffprobe"""
+    tags = {}
+    for kind, box_start, box_end in _boxes(data, start, end):
+        if kind == b'\xa9swr':
+            # QuickTime string: length, packed language ('und' only), text
+            length, language = struct.unpack_from('>HH', data, box_start)
+            if language != _LANGUAGE_UND:
+                return None
+            tags['encoder'] = bytes(data[box_start + 4:box_start + 4 + length]).decode('utf-8')
+            continue
+        if kind != b'meta':
+            return None
+        if not struct.unpack_from('>I', data, box_start)[0]:
+            box_start += 4  # ISO meta is a full box
+        ilst = _child(data, box_start, box_end, b'ilst')
+        if ilst is None:
+            return None
+        for item, item_start, item_end in _boxes(data, *ilst):
+            value = _child(data, item_start, item_end, b'data')
+            if item != b'\xa9too' or value is None or struct.unpack_from('>I', data, value[0])[0] != 1:
+                return None
+            tags['encoder'] = bytes(data[value[0] + 8:value[1]]).decode('utf-8')
+    return tags
+
+def _probe_boxes(data, size: int) -> Optional[Dict[str, Any]]:
+    top_level = {}
+    for kind, start, end in _boxes(data, 0, size):
+        top_level.setdefault(kind, (start, end))
+    if b'ftyp' not in top_level or b'moov' not in top_level or b'moof' in top_level:
+        return None
+
+    ftyp_start, ftyp_end = top_level[b'ftyp']
+    tags = {
+        'major_brand': bytes(data[ftyp_start:ftyp_start + 4]).decode('latin-1'),
+        'minor_version': str(struct.unpack_from('>I', data, ftyp_start + 4)[0]),
+        'compatible_brands': bytes(data[ftyp_start + 8:ftyp_end]).split(b'\x00')[0].decode('latin-1')
+    }
+
+    moov_start, moov_end = top_level[b'moov']
+    if _child(data, moov_start, moov_end, b'mvex') is not None:
+        return None
+    mvhd = _child(data, moov_start, moov_end, b'mvhd')
+    if mvhd is None:
+        return None
+    if data[mvhd[0]] == 1:
+        created, _, timescale, duration = struct.unpack_from('>QQIQ', data, mvhd[0] + 4)
+    else:
+        created, _, timescale, duration = struct.unpack_from('>IIII', data, mvhd[0] + 4)
+    if not timescale or not duration:
+        return None
+    if created:
+        created -= _MP4_EPOCH_OFFSET if created >= _MP4_EPOCH_OFFSET else 0
+        timestamp = datetime.fromtimestamp(created, timezone.utc)
+        tags['creation_time'] = timestamp.strftime('%Y-%m-%dT%H:%M:%S.000000Z')
+
+    streams = []
+    for kind, start, end in _boxes(data, moov_start, moov_end):
+        if kind == b'trak':
+            stream = _parse_trak(data, start, end)
+            if stream is None:
+                return None
+            if stream:
+                streams.append(stream)
+        elif kind == b'udta':
+            udta_tags = _parse_udta(data, start, end)
+            if udta_tags is None:
+                return None
+            tags.update(udta_tags)
+
+    # Same microsecond rounding and bitrate as libavformat
+    duration_us = (duration * 1_000_000 + timescale // 2) // timescale
+    return {
+        'format': {
+            'format_name': _FORMAT_NAME,
+            'duration': f'{duration_us / 1_000_000:f}',
+            'size': str(size),
+            'bit_rate': str(int(size * 8.0 * 1_000_000 / duration_us)),
+            'tags': tags
+        },
+        'streams': streams
+    }
+
+def probe_mp4(path: str) -> Optional[Dict[str, Any]]:
+    """ffprobe-shaped format/stream info for a plain H.264/AAC MP4, or None.
+
+    Only the header boxes are touched through a read-only mapping, so this
+    costs no subprocess and reads a few pages rather than the whole file.
+    """
+    try:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < 8:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return _probe_boxes(data, size)
+    except (OSError, ValueError, IndexError, struct.error, StopIteration, UnicodeDecodeError):
+        return None
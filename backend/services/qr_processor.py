@@ -1,42 +1,300 @@
 import io
+import os
+import copy
+import queue
 import zipfile
-from typing import Dict, Any, Optional, List, Tuple
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple, Iterator, Generator
 import qrcode
 from qrcode.image.styledpil import StyledPilImage
+from qrcode.image.styles.moduledrawers.pil import ANTIALIASING_FACTOR
 from qrcode.image.styles.moduledrawers import RoundedModuleDrawer, CircleModuleDrawer, SquareModuleDrawer
 from qrcode.image.styles.colorfills import SolidFillColorMask
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageChops, ImageDraw, ImageFont, ImageOps
 import logging
 import base64
 import json
 
+try:
+    import segno
+except ImportError:  # Optional faster matrix encoder
+    segno = None
+
 logger = logging.getLogger(__name__)
 
-class QRProcessor:
-    """Service for QR code generation and decoding"""
+# Reusable output buffers; batch generation would otherwise allocate one
+# BytesIO per QR code plus one for the archive
+_BUF_POOL: "queue.SimpleQueue[io.BytesIO]" = queue.SimpleQueue()
+
+
+# Longest edge of the downsampled copy tried first when decoding
+_DECODE_FAST_EDGE = 640
+
+def _otsu_threshold(histogram: List[int]) -> int:
+    """Pick the gray level that best separates a 256-bin histogram in two"""
+    total = sum(histogram)
+    if not total:
+        return 128
     
-    @staticmethod
-    def generate_qr_code(
-        content: str,
-        output_format: str = "png",
-        size: int = 256,
-        error_correction: str = "M",
-        border: int = 4,
-        fill_color: str = "black",
-        back_color: str = "white",
-        style: str = "square"
-    ) -> Tuple[bytes, Dict[str, Any]]:
-        """Generate QR code from text or URL"""
-        try:
-            # Map error correction levels
-            error_correction_map = {
-                "L": qrcode.constants.ERROR_CORRECT_L,  # ~7%
-                "M": qrcode.constants.ERROR_CORRECT_M,  # ~15%
-                "Q": qrcode.constants.ERROR_CORRECT_Q,  # ~25%
-                "H": qrcode.constants.ERROR_CORRECT_H   # ~30%
-            }
-            
-            error_level = error_correction_map.get(error_correction, qrcode.constants.ERROR_CORRECT_M)
+    sum_all = sum(level * count for level, count in enumerate(histogram))
+    sum_back = 0
+    weight_back = 0
+    best_threshold = 128
+    best_variance = 0.0
+    
+    for level, count in enumerate(histogram):
+        weight_back += count
+        if not weight_back:
+            continue
+        weight_fore = total - weight_back
+        if not weight_fore:
+            break
+        sum_back += level * count
+        mean_back = sum_back / weight_back
+        mean_fore = (sum_all - sum_back) / weight_fore
+        variance = weight_back * weight_fore * (mean_back - mean_fore) ** 2
+        if variance > best_variance:
+            best_variance = variance
+            best_threshold = level + 1
+    
+    return best_threshold
+
+
+def _is_text(content: str) -> bool:
+    """Check that decoded content has no control characters besides whitespace"""
+    return content.isprintable() or all(
+        char.isprintable() or char in "\t\r\n" for char in content
+    )
+
+
+# Content type detection by URI-style prefix, checked in order
+_PREFIX_MAP = (
+    ("http://", "url"),
+    ("https://", "url"),
+    ("mailto:", "email"),
+    ("tel:", "phone"),
+    ("wifi:", "wifi"),
+    ("geo:", "location"),
+)
+
+
+def _classify_content(content: str) -> str:
+    """Detect the content type of a QR payload"""
+    for prefix, content_type in _PREFIX_MAP:
+        if content.startswith(prefix):
+            return content_type
+    return "text"
+
+
+class _ZipChunkSink:
+    """Write-only stream that lets a ZipFile be drained chunk by chunk"""
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self) -> None:
+        pass
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+@contextmanager
+def _pooled_buffer() -> Iterator[io.BytesIO]:
+    """Borrow an empty BytesIO from the pool, returning it reset on exit"""
+    try:
+        buf = _BUF_POOL.get_nowait()
+    except queue.Empty:
+        buf = io.BytesIO()
+    try:
+        yield buf
+    finally:
+        buf.seek(0)
+        buf.truncate(0)
+        _BUF_POOL.put(buf)
+
+# Map error correction levels
+_EC_MAP = {
+    "L": qrcode.constants.ERROR_CORRECT_L,  # ~7%
+    "M": qrcode.constants.ERROR_CORRECT_M,  # ~15%
+    "Q": qrcode.constants.ERROR_CORRECT_Q,  # ~25%
+    "H": qrcode.constants.ERROR_CORRECT_H   # ~30%
+}
+
+# Opt-in segno encoder for plain square raster output. Its matrix
+# construction is considerably faster than qrcode's; styled and SVG output
+# always use qrcode, whose image factories consume its own matrix
+_SEGNO_ENABLED = segno is not None and os.getenv('QR_MATRIX_BACKEND', 'qrcode').lower() == 'segno'
+
+
+def _render_segno(
+    content: str,
+    error_correction: str,
+    size: int,
+    border: int,
+    fill_color: str,
+    back_color: str
+) -> Tuple[Image.Image, int, int]:
+    """Render a square-module QR code from a segno-encoded matrix"""
+    # boost_error=False keeps the requested level, as qrcode does
+    qr = segno.make_qr(
+        content,
+        error=error_correction if error_correction in _EC_MAP else "M",
+        boost_error=False
+    )
+    total_modules = qr.symbol_size(scale=1, border=border)[0]
+    box_size = max(1, size // total_modules)
+    
+    pixels = bytes(
+        0 if dark else 255
+        for row in qr.matrix_iter(scale=1, border=border)
+        for dark in row
+    )
+    img = Image.frombytes('L', (total_modules, total_modules), pixels)
+    img = img.resize((total_modules * box_size, total_modules * box_size), Image.Resampling.NEAREST)
+    
+    if fill_color == "black" and back_color == "white":
+        img = img.convert('1')
+    else:
+        img = ImageOps.colorize(img, black=fill_color, white=back_color)
+    
+    return img, qr.version, total_modules - 2 * border
+
+
+@lru_cache(maxsize=32)
+def _circle_stencil(box_size: int, grid_size: int) -> Image.Image:
+    """Antialiased circle mask tiled over a grid_size x grid_size module grid"""
+    # Same tile CircleModuleDrawer draws: supersampled, then LANCZOS-reduced
+    fake_size = box_size * ANTIALIASING_FACTOR
+    tile = Image.new('L', (fake_size, fake_size), 0)
+    ImageDraw.Draw(tile).ellipse((0, 0, fake_size, fake_size), fill=255)
+    tile = tile.resize((box_size, box_size), Image.Resampling.LANCZOS)
+    
+    # Tile by repeatedly doubling the filled area: O(log n) pastes
+    side = box_size * grid_size
+    stencil = Image.new('L', (side, side), 0)
+    stencil.paste(tile, (0, 0))
+    filled = box_size
+    while filled < side:
+        stencil.paste(stencil.crop((0, 0, filled, box_size)), (filled, 0))
+        filled *= 2
+    filled = box_size
+    while filled < side:
+        stencil.paste(stencil.crop((0, 0, side, filled)), (0, filled))
+        filled *= 2
+    return stencil
+
+
+def _render_circle_modules(qr: qrcode.QRCode) -> Image.Image:
+    """Render circle-style modules without a per-module Python draw loop
+    
+    Produces the same image as StyledPilImage with CircleModuleDrawer (which
+    ignores fill/back colors): circles for data modules, squares for the
+    three finder patterns.
+    """
+    box_size = qr.box_size
+    border = qr.border
+    count = qr.modules_count
+    matrix = qr.get_matrix()
+    grid_size = len(matrix)
+    
+    # One pixel per module, blown up to box_size blocks
+    module_mask = Image.frombytes(
+        'L',
+        (grid_size, grid_size),
+        bytes(255 if module else 0 for row in matrix for module in row)
+    ).resize((grid_size * box_size, grid_size * box_size), Image.Resampling.NEAREST)
+    
+    mask = ImageChops.multiply(module_mask, _circle_stencil(box_size, grid_size))
+    
+    # Finder patterns keep square modules
+    eye_side = 7 * box_size
+    for row, col in ((0, 0), (0, count - 7), (count - 7, 0)):
+        left = (border + col) * box_size
+        top = (border + row) * box_size
+        region = (left, top, left + eye_side, top + eye_side)
+        mask.paste(module_mask.crop(region), region[:2])
+    
+    return ImageOps.invert(mask).convert('RGB')
+
+
+# Module drawers for styled output. Drawers bind to the image they render
+# in initialize(), so a fresh instance is made per render rather than
+# sharing singletons across concurrent requests
+_MODULE_DRAWERS = {
+    "rounded": RoundedModuleDrawer,
+    "circle": CircleModuleDrawer,
+}
+
+# Rendered QR codes are deterministic for a given set of parameters, so
+# repeated payloads (batch uploads, vCard/WiFi helpers) are served from a
+# cache bounded by total bytes; a large styled render is over 1 MB, so a
+# count limit alone would let distinct requests pin hundreds of MB
+_QR_CACHE_MAX_BYTES = 32 * 1024 * 1024
+_QR_CACHE_MAX_ENTRY_BYTES = 256 * 1024
+
+
+class _RenderCache:
+    """Thread-safe LRU of rendered QR codes, evicting by total payload size"""
+    
+    def __init__(self, max_bytes: int, max_entry_bytes: int):
+        self._entries: "OrderedDict[tuple, Tuple[bytes, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+    
+    def get(self, key: tuple) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+    
+    def put(self, key: tuple, entry: Tuple[bytes, Dict[str, Any]]) -> None:
+        size = len(entry[0])
+        if size > self.max_entry_bytes:
+            return  # Large renders would crowd out everything else
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+
+_qr_cache = _RenderCache(_QR_CACHE_MAX_BYTES, _QR_CACHE_MAX_ENTRY_BYTES)
+
+
+def _generate_qr_code(
+    content: str,
+    output_format: str,
+    size: int,
+    error_correction: str,
+    border: int,
+    fill_color: str,
+    back_color: str,
+    style: str
+) -> Tuple[bytes, Dict[str, Any]]:
+    """Render a QR code; results may be cached, callers must not mutate them"""
+    try:
+        if _SEGNO_ENABLED and style not in _MODULE_DRAWERS and output_format.lower() != "svg":
+            img, qr_version, modules_count = _render_segno(
+                content, error_correction, size, border, fill_color, back_color
+            )
+        else:
+            error_level = _EC_MAP.get(error_correction, qrcode.constants.ERROR_CORRECT_M)
             
             # Create QR code instance
             qr = qrcode.QRCode(
@@ -49,18 +307,19 @@ class QRProcessor:
             qr.add_data(content)
             qr.make(fit=True)
             
+            # Size modules natively so the rendered image is (close to) the
+            # requested size instead of resampling a fixed box_size=10 render
+            total_modules = qr.modules_count + 2 * border
+            qr.box_size = max(1, size // total_modules)
+            
             # Generate image based on style
-            if style == "rounded":
+            drawer_class = _MODULE_DRAWERS.get(style)
+            if style == "circle":
+                img = _render_circle_modules(qr)
+            elif drawer_class is not None:
                 img = qr.make_image(
                     image_factory=StyledPilImage,
-                    module_drawer=RoundedModuleDrawer(),
-                    fill_color=fill_color,
-                    back_color=back_color
-                )
-            elif style == "circle":
-                img = qr.make_image(
-                    image_factory=StyledPilImage,
-                    module_drawer=CircleModuleDrawer(),
+                    module_drawer=drawer_class(),
                     fill_color=fill_color,
                     back_color=back_color
                 )
@@ -70,14 +329,18 @@ class QRProcessor:
                     back_color=back_color
                 )
             
-            # Resize to requested size
-            img = img.resize((size, size), Image.Resampling.LANCZOS)
-            
-            # Convert to bytes
-            output_buffer = io.BytesIO()
-            
+            qr_version, modules_count = qr.version, qr.modules_count
+        
+        # Resize away any residual mismatch; nearest keeps modules crisp
+        if img.size != (size, size):
+            img = img.resize((size, size), Image.Resampling.NEAREST)
+        
+        # Convert to bytes
+        with _pooled_buffer() as output_buffer:
             if output_format.lower() == "png":
-                img.save(output_buffer, format="PNG", optimize=True)
+                # Black/white square codes are already mode "1" and encode as a
+                # 1-bit PNG; optimize=True's multi-pass search buys little here
+                img.save(output_buffer, format="PNG", compress_level=1)
             elif output_format.lower() == "jpg" or output_format.lower() == "jpeg":
                 # Convert to RGB for JPEG
                 if img.mode in ('RGBA', 'LA', 'P'):
@@ -88,18 +351,9 @@ class QRProcessor:
             elif output_format.lower() == "webp":
                 img.save(output_buffer, format="WebP", quality=95, optimize=True)
             elif output_format.lower() == "svg":
-                # For SVG, we need to use a different approach
+                # For SVG, render the already-built matrix as vector paths
                 from qrcode.image.svg import SvgPathImage
-                qr_svg = qrcode.QRCode(
-                    version=1,
-                    error_correction=error_level,
-                    box_size=size//25,  # Adjust box size for SVG
-                    border=border,
-                )
-                qr_svg.add_data(content)
-                qr_svg.make(fit=True)
-                
-                svg_img = qr_svg.make_image(image_factory=SvgPathImage)
+                svg_img = qr.make_image(image_factory=SvgPathImage)
                 svg_content = svg_img.to_string(encoding='unicode')
                 output_buffer.write(svg_content.encode('utf-8'))
             else:
@@ -107,44 +361,56 @@ class QRProcessor:
             
             output_buffer.seek(0)
             qr_data = output_buffer.getvalue()
-            
-            # Detect content type
-            content_type = "text"
-            if content.startswith(("http://", "https://")):
-                content_type = "url"
-            elif content.startswith("mailto:"):
-                content_type = "email"
-            elif content.startswith("tel:"):
-                content_type = "phone"
-            elif content.startswith("wifi:"):
-                content_type = "wifi"
-            elif content.startswith("geo:"):
-                content_type = "location"
-            
-            metadata = {
-                "content_preview": content[:100] + "..." if len(content) > 100 else content,
-                "content_length": len(content),
-                "content_type": content_type,
-                "output_format": output_format,
-                "size": f"{size}x{size}",
-                "error_correction": error_correction,
-                "border": border,
-                "qr_version": qr.version,
-                "data_modules": qr.modules_count,
-                "style": style,
-                "colors": {
-                    "fill": fill_color,
-                    "background": back_color
-                },
-                "file_size": len(qr_data)
-            }
-            
-            logger.info(f"Generated QR code: {len(content)} chars -> {len(qr_data)} bytes")
-            return qr_data, metadata
-            
-        except Exception as e:
-            logger.error(f"QR code generation failed: {e}")
-            raise
+        
+        metadata = {
+            "content_preview": content[:100] + "..." if len(content) > 100 else content,
+            "content_length": len(content),
+            "content_type": _classify_content(content),
+            "output_format": output_format,
+            "size": f"{size}x{size}",
+            "error_correction": error_correction,
+            "border": border,
+            "qr_version": qr_version,
+            "data_modules": modules_count,
+            "style": style,
+            "colors": {
+                "fill": fill_color,
+                "background": back_color
+            },
+            "file_size": len(qr_data)
+        }
+        
+        logger.info(f"Generated QR code: {len(content)} chars -> {len(qr_data)} bytes")
+        return qr_data, metadata
+        
+    except Exception as e:
+        logger.error(f"QR code generation failed: {e}")
+        raise
+
+
+class QRProcessor:
+    """Service for QR code generation and decoding"""
+    
+    @staticmethod
+    def generate_qr_code(
+        content: str,
+        output_format: str = "png",
+        size: int = 256,
+        error_correction: str = "M",
+        border: int = 4,
+        fill_color: str = "black",
+        back_color: str = "white",
+        style: str = "square"
+    ) -> Tuple[bytes, Dict[str, Any]]:
+        """Generate QR code from text or URL"""
+        key = (content, output_format, size, error_correction, border, fill_color, back_color, style)
+        cached = _qr_cache.get(key)
+        if cached is None:
+            cached = _generate_qr_code(*key)
+            _qr_cache.put(key, cached)
+        qr_data, metadata = cached
+        # Callers update the metadata in place, so hand out a private copy
+        return qr_data, copy.deepcopy(metadata)
     
     @staticmethod
     def decode_qr_code(image_data: bytes) -> Tuple[List[str], Dict[str, Any]]:
@@ -164,15 +430,39 @@ class QRProcessor:
             if image.mode not in ('RGB', 'L'):
                 image = image.convert('RGB')
             
-            # Decode QR codes
-            decoded_objects = pyzbar.decode(image, symbols=[ZBarSymbol.QRCODE])
+            # zbar works on luminance only, so hand it a single-channel image
+            gray_image = image.convert('L')
+            
+            def scan(gray: Image.Image) -> list:
+                # Pass the raw 8-bit (Y800) buffer so pyzbar skips its own
+                # PIL introspection and conversion
+                return pyzbar.decode(
+                    (gray.tobytes(), gray.width, gray.height),
+                    symbols=[ZBarSymbol.QRCODE]
+                )
+            
+            # Decode QR codes, trying a downsampled copy first: finder patterns
+            # survive scaling, and zbar's cost grows with the pixel count
+            decoded_objects = []
+            scale = 1.0
+            if max(gray_image.size) > _DECODE_FAST_EDGE:
+                small_image = gray_image.copy()
+                small_image.thumbnail((_DECODE_FAST_EDGE, _DECODE_FAST_EDGE), Image.Resampling.BILINEAR)
+                decoded_objects = scan(small_image)
+                scale = gray_image.width / small_image.width
+            
+            if not decoded_objects:
+                scale = 1.0
+                decoded_objects = scan(gray_image)
             
             if not decoded_objects:
                 # Try with different image processing
-                # Convert to grayscale and enhance contrast
-                gray_image = image.convert('L')
-                enhanced_image = gray_image.point(lambda x: 0 if x < 128 else 255, '1')
-                decoded_objects = pyzbar.decode(enhanced_image, symbols=[ZBarSymbol.QRCODE])
+                # Binarize at the Otsu threshold, which copes with uneven
+                # lighting better than a fixed midpoint; point() with a
+                # 256-entry table is applied in C
+                threshold = _otsu_threshold(gray_image.histogram())
+                enhanced_image = gray_image.point([0] * threshold + [255] * (256 - threshold))
+                decoded_objects = scan(enhanced_image)
             
             decoded_contents = []
             qr_details = []
@@ -182,50 +472,34 @@ class QRProcessor:
                     content = obj.data.decode('utf-8')
                     decoded_contents.append(content)
                     
-                    # Analyze content type
-                    content_type = "text"
-                    if content.startswith(("http://", "https://")):
-                        content_type = "url"
-                    elif content.startswith("mailto:"):
-                        content_type = "email"
-                    elif content.startswith("tel:"):
-                        content_type = "phone"
-                    elif content.startswith("wifi:"):
-                        content_type = "wifi"
-                    elif content.startswith("geo:"):
-                        content_type = "location"
-                    
                     qr_details.append({
                         "content": content,
-                        "content_type": content_type,
+                        "content_type": _classify_content(content),
                         "content_length": len(content),
+                        # Report positions in the coordinates of the original image
                         "position": {
-                            "left": obj.rect.left,
-                            "top": obj.rect.top,
-                            "width": obj.rect.width,
-                            "height": obj.rect.height
+                            "left": round(obj.rect.left * scale),
+                            "top": round(obj.rect.top * scale),
+                            "width": round(obj.rect.width * scale),
+                            "height": round(obj.rect.height * scale)
                         },
-                        "polygon": [(point.x, point.y) for point in obj.polygon],
+                        "polygon": [(round(point.x * scale), round(point.y * scale)) for point in obj.polygon],
                         "quality": obj.quality if hasattr(obj, 'quality') else None
                     })
                     
                 except UnicodeDecodeError:
-                    # Try other encodings
-                    for encoding in ['latin-1', 'cp1252', 'iso-8859-1']:
-                        try:
-                            content = obj.data.decode(encoding)
-                            decoded_contents.append(content)
-                            qr_details.append({
-                                "content": content,
-                                "content_type": "binary",
-                                "encoding": encoding,
-                                "content_length": len(content)
-                            })
-                            break
-                        except UnicodeDecodeError:
-                            continue
+                    # latin-1 maps every byte value, so it cannot fail; only
+                    # payloads with control bytes are reported as base64
+                    content = obj.data.decode('latin-1')
+                    if _is_text(content):
+                        decoded_contents.append(content)
+                        qr_details.append({
+                            "content": content,
+                            "content_type": "binary",
+                            "encoding": "latin-1",
+                            "content_length": len(content)
+                        })
                     else:
-                        # If all encodings fail, store as base64
                         content = base64.b64encode(obj.data).decode('ascii')
                         decoded_contents.append(f"base64:{content}")
                         qr_details.append({
@@ -254,6 +528,101 @@ class QRProcessor:
             logger.error(f"QR code decoding failed: {e}")
             raise
     
+    @staticmethod
+    def stream_batch_qr_codes(
+        content_list: List[str],
+        output_format: str = "png",
+        size: int = 256,
+        error_correction: str = "M",
+        border: int = 4,
+        naming_pattern: str = "qr_{index}"
+    ) -> Generator[bytes, None, Dict[str, Any]]:
+        """Generate multiple QR codes as a ZIP archive, yielding it in chunks
+        
+        Each member is flushed as soon as it is written, so only one QR code
+        is held in memory at a time. The generator's return value is the
+        batch summary that is also written to batch_summary.json.
+        """
+        if len(content_list) > 1000:
+            raise ValueError("Maximum 1000 QR codes per batch")
+        
+        sink = _ZipChunkSink()
+        successful_codes = 0
+        failed_codes = 0
+        file_list = []
+        
+        # Images are already entropy-coded, so members are stored as-is
+        with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED) as zip_file:
+            for i, content in enumerate(content_list):
+                try:
+                    # Generate QR code
+                    qr_data, qr_metadata = QRProcessor.generate_qr_code(
+                        content,
+                        output_format=output_format,
+                        size=size,
+                        error_correction=error_correction,
+                        border=border
+                    )
+                    
+                    # Create filename
+                    filename = naming_pattern.format(
+                        index=i+1,
+                        content=content[:20].replace('/', '_').replace('\\', '_')
+                    )
+                    filename = f"{filename}.{output_format}"
+                    
+                    # Add to ZIP
+                    zip_file.writestr(filename, qr_data)
+                    file_list.append({
+                        "filename": filename,
+                        "content_preview": content[:50] + "..." if len(content) > 50 else content,
+                        "size": len(qr_data),
+                        "success": True
+                    })
+                    successful_codes += 1
+                    
+                except Exception as e:
+                    logger.warning(f"Failed to generate QR code {i+1}: {e}")
+                    failed_codes += 1
+                    file_list.append({
+                        "filename": f"failed_{i+1}.txt",
+                        "content_preview": content[:50] + "..." if len(content) > 50 else content,
+                        "error": str(e),
+                        "success": False
+                    })
+                
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+            
+            # Add summary file
+            summary = {
+                "total_requested": len(content_list),
+                "successful": successful_codes,
+                "failed": failed_codes,
+                "settings": {
+                    "output_format": output_format,
+                    "size": size,
+                    "error_correction": error_correction,
+                    "border": border
+                },
+                "files": file_list
+            }
+            
+            zip_file.writestr(
+                "batch_summary.json",
+                json.dumps(summary, indent=2),
+                compress_type=zipfile.ZIP_DEFLATED
+            )
+        
+        # Closing the archive writes the central directory
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+        
+        logger.info(f"Generated batch of {successful_codes}/{len(content_list)} QR codes")
+        return summary
+    
     @staticmethod
     def batch_generate_qr_codes(
         content_list: List[str],
@@ -265,85 +634,36 @@ class QRProcessor:
     ) -> Tuple[bytes, Dict[str, Any]]:
         """Generate multiple QR codes and return as ZIP archive"""
         try:
-            if len(content_list) > 1000:
-                raise ValueError("Maximum 1000 QR codes per batch")
-            
-            zip_buffer = io.BytesIO()
-            successful_codes = 0
-            failed_codes = 0
-            file_list = []
+            chunks = QRProcessor.stream_batch_qr_codes(
+                content_list,
+                output_format=output_format,
+                size=size,
+                error_correction=error_correction,
+                border=border,
+                naming_pattern=naming_pattern
+            )
             
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                for i, content in enumerate(content_list):
+            with _pooled_buffer() as zip_buffer:
+                while True:
                     try:
-                        # Generate QR code
-                        qr_data, qr_metadata = QRProcessor.generate_qr_code(
-                            content,
-                            output_format=output_format,
-                            size=size,
-                            error_correction=error_correction,
-                            border=border
-                        )
-                        
-                        # Create filename
-                        filename = naming_pattern.format(
-                            index=i+1,
-                            content=content[:20].replace('/', '_').replace('\\', '_')
-                        )
-                        filename = f"{filename}.{output_format}"
-                        
-                        # Add to ZIP
-                        zip_file.writestr(filename, qr_data)
-                        file_list.append({
-                            "filename": filename,
-                            "content_preview": content[:50] + "..." if len(content) > 50 else content,
-                            "size": len(qr_data),
-                            "success": True
-                        })
-                        successful_codes += 1
-                        
-                    except Exception as e:
-                        logger.warning(f"Failed to generate QR code {i+1}: {e}")
-                        failed_codes += 1
-                        file_list.append({
-                            "filename": f"failed_{i+1}.txt",
-                            "content_preview": content[:50] + "..." if len(content) > 50 else content,
-                            "error": str(e),
-                            "success": False
-                        })
-                
-                # Add summary file
-                summary = {
-                    "total_requested": len(content_list),
-                    "successful": successful_codes,
-                    "failed": failed_codes,
-                    "settings": {
-                        "output_format": output_format,
-                        "size": size,
-                        "error_correction": error_correction,
-                        "border": border
-                    },
-                    "files": file_list
-                }
-                
-                zip_file.writestr("batch_summary.json", json.dumps(summary, indent=2))
-            
-            zip_buffer.seek(0)
-            zip_data = zip_buffer.getvalue()
+                        zip_buffer.write(next(chunks))
+                    except StopIteration as done:
+                        summary = done.value
+                        break
+                zip_data = zip_buffer.getvalue()
             
             metadata = {
                 "total_qr_codes": len(content_list),
-                "successful_codes": successful_codes,
-                "failed_codes": failed_codes,
+                "successful_codes": summary["successful"],
+                "failed_codes": summary["failed"],
                 "output_format": output_format,
                 "size": f"{size}x{size}",
                 "error_correction": error_correction,
                 "archive_size": len(zip_data),
-                "files_in_archive": len(file_list) + 1,  # +1 for summary
+                "files_in_archive": len(summary["files"]) + 1,  # +1 for summary
                 "naming_pattern": naming_pattern
             }
             
-            logger.info(f"Generated batch of {successful_codes}/{len(content_list)} QR codes")
             return zip_data, metadata
             
         except Exception as e:
@@ -1,15 +1,32 @@
 import os
+import io
 import uuid
+import asyncio
 import hashlib
+from functools import lru_cache
 from typing import Optional, BinaryIO
 from pathlib import Path
 import boto3
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 import aiofiles
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Payloads below this size are written directly instead of via aiofiles
+SMALL_WRITE_THRESHOLD = 64 * 1024
+
+def _split_suffix(filename: str) -> str:
+    """Return the file extension (with dot), matching Path(filename).suffix"""
+    name = filename.rpartition('/')[2]
+    index = name.rfind('.')
+    if 0 < index < len(name) - 1:
+        return name[index:]
+    return ''
+
 class StorageService:
     """Abstract storage service interface"""
     
@@ -37,14 +54,18 @@ class LocalStorageService(StorageService):
         """Save file locally and return URL"""
         try:
             # Generate unique filename
-            file_id = str(uuid.uuid4())
-            file_extension = Path(filename).suffix
+            file_id = uuid.uuid4().hex
+            file_extension = _split_suffix(filename)
             unique_filename = f"{file_id}{file_extension}"
             file_path = self.upload_dir / unique_filename
             
-            # Save file
-            async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(file_data)
+            # Save file; small writes finish faster inline than the round
+            # trip through aiofiles' thread pool
+            if len(file_data) < SMALL_WRITE_THRESHOLD:
+                file_path.write_bytes(file_data)
+            else:
+                async with aiofiles.open(file_path, 'wb') as f:
+                    await f.write(file_data)
             
             # Return public URL
             return f"{self.base_url}/uploads/{unique_filename}"
@@ -78,24 +99,38 @@ class S3StorageService(StorageService):
             region_name=region,
             endpoint_url=endpoint_url,
             aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
+            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+            config=Config(
+                max_pool_connections=50,  # Shared by concurrent uploads and multipart parts
+                retries={'mode': 'adaptive'},
+                tcp_keepalive=True
+            )
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=8 * 1024 * 1024,
+            max_concurrency=8
         )
         
     async def upload_file(self, file_data: bytes, filename: str, content_type: str) -> str:
         """Upload to S3 and return public URL"""
         try:
             # Generate unique key
-            file_id = str(uuid.uuid4())
-            file_extension = Path(filename).suffix
+            file_id = uuid.uuid4().hex
+            file_extension = _split_suffix(filename)
             s3_key = f"conversions/{file_id}{file_extension}"
             
-            # Upload to S3
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=s3_key,
-                Body=file_data,
-                ContentType=content_type,
-                CacheControl='max-age=31536000'  # 1 year cache
+            # Upload to S3 off the event loop; large files go up as parallel
+            # multipart chunks
+            await asyncio.to_thread(
+                self.s3_client.upload_fileobj,
+                io.BytesIO(file_data),
+                self.bucket_name,
+                s3_key,
+                ExtraArgs={
+                    'ContentType': content_type,
+                    'CacheControl': 'max-age=31536000'  # 1 year cache
+                },
+                Config=self.transfer_config
             )
             
             # Return public URL
@@ -104,7 +139,7 @@ class S3StorageService(StorageService):
             else:
                 return f"https://{self.bucket_name}.s3.amazonaws.com/{s3_key}"
                 
-        except ClientError as e:
+        except (ClientError, S3UploadFailedError) as e:
             logger.error(f"Failed to upload to S3: {e}")
             raise
     
@@ -114,7 +149,8 @@ class S3StorageService(StorageService):
             # Extract S3 key from URL
             s3_key = file_url.split('/')[-2] + '/' + file_url.split('/')[-1]
             
-            self.s3_client.delete_object(
+            await asyncio.to_thread(
+                self.s3_client.delete_object,
                 Bucket=self.bucket_name,
                 Key=s3_key
             )
@@ -125,8 +161,13 @@ class S3StorageService(StorageService):
             return False
 
 # Storage service factory
+@lru_cache(maxsize=1)
 def get_storage_service() -> StorageService:
-    """Get configured storage service"""
+    """Get configured storage service
+    
+    The service is built once per process so the S3 client and its
+    keep-alive connection pool are shared by every request.
+    """
     storage_type = os.getenv('STORAGE_TYPE', 'local')
     
     if storage_type == 's3':
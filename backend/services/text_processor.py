@@ -1,62 +1,270 @@
 import re
 import json
 import io
-from typing import Dict, Any, Optional, List, Tuple
+import copy
+import codecs
+from typing import Dict, Any, Optional, List, Set, Tuple
 import logging
 import unicodedata
 from collections import Counter
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+# Precompiled patterns shared by the text utilities
+_WORD_RE = re.compile(r'\w+')
+_SENTENCE_SPLIT_RE = re.compile(r'([.!?]+)')
+_SENTENCE_END_RE = re.compile(r'[.!?]+(?:\s|$)')
+# A paragraph from its first non-space character up to the next blank line
+# ('\n\n'), i.e. one match per non-blank chunk of text.split('\n\n')
+_PARAGRAPH_RE = re.compile(r'\S[^\n]*(?:\n(?!\n)[^\n]*)*')
+# Runs of 2+ spaces (group 1) or whitespace spanning 3+ newlines
+_WHITESPACE_RE = re.compile(r'( {2,})|\n\s*\n\s*\n+')
+
+# Inline Markdown tokens; leftmost match wins, so code spans and images
+# are never rewritten by the emphasis or link rules. The leading lookahead
+# lets the scanner skip plain text without trying every alternative.
+_MARKDOWN_INLINE = (
+    r'(?P<code>`(?P<code_text>.+?)`)'
+    r'|(?P<img>!\[(?P<img_alt>[^\]]*)\]\((?P<img_src>[^)]+)\))'
+    r'|(?P<link>\[(?P<link_text>[^\]]+)\]\((?P<link_href>[^)]+)\))'
+    r'|(?P<strong>\*\*(?!\s)(?P<strong_text>.+?)(?<!\s)\*\*)'
+    r'|(?P<em>\*(?!\s)(?P<em_text>.+?)(?<!\s)\*)'
+    r'|(?P<ustrong>(?<!\w)__(?!\s)(?P<ustrong_text>.+?)(?<!\s)__(?!\w))'
+    r'|(?P<uem>(?<!\w)_(?!\s)(?P<uem_text>.+?)(?<!\s)_(?!\w))'
+)
+_MARKDOWN_INLINE_RE = re.compile(r'(?=[`!\[*_])(?:' + _MARKDOWN_INLINE + ')')
+# Block tokens (fenced code, headers) plus the inline tokens, in one pass
+_MARKDOWN_RE = re.compile(
+    r'(?=[`!\[*_#])(?:'
+    r'(?P<fence>^```(?P<fence_text>(?s:.*?))^```)'
+    r'|(?P<header>^(?P<header_level>#{1,6}) (?P<header_text>.*)$)'
+    r'|' + _MARKDOWN_INLINE + ')',
+    re.MULTILINE
+)
+_LIST_UL_RE = re.compile(r'^\s*[-*+]\s+')
+_LIST_OL_RE = re.compile(r'^\s*\d+\.\s+')
+
+# Markdown feature reported for each token kind, and the reporting order
+_TOKEN_FEATURES = {
+    "fence": "code",
+    "header": "headers",
+    "code": "code",
+    "img": "images",
+    "link": "links",
+    "strong": "emphasis",
+    "em": "emphasis",
+    "ustrong": "emphasis",
+    "uem": "emphasis",
+}
+_FEATURE_ORDER = ("headers", "emphasis", "code", "links", "images", "lists")
+
+# Recent analyze_text results; format_text and repeated requests for the
+# same text reuse them. Kept small since every entry holds its text.
+_ANALYSIS_CACHE_SIZE = 32
+
+# Inline CSS for the standalone HTML document themes
+_CSS_STYLES = {
+    "github": """
+    <style>
+    body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; line-height: 1.6; color: #333; max-width: 800px; margin: 0 auto; padding: 20px; }
+    h1, h2, h3, h4, h5, h6 { margin-top: 24px; margin-bottom: 16px; font-weight: 600; line-height: 1.25; }
+    h1 { font-size: 2em; border-bottom: 1px solid #eaecef; padding-bottom: 10px; }
+    h2 { font-size: 1.5em; border-bottom: 1px solid #eaecef; padding-bottom: 8px; }
+    code { background-color: #f6f8fa; padding: 2px 4px; border-radius: 3px; font-family: 'SFMono-Regular', Consolas, monospace; }
+    pre { background-color: #f6f8fa; padding: 16px; border-radius: 6px; overflow: auto; }
+    a { color: #0366d6; text-decoration: none; }
+    a:hover { text-decoration: underline; }
+    ul, ol { padding-left: 30px; }
+    li { margin-bottom: 4px; }
+    </style>
+    """,
+    "minimal": """
+    <style>
+    body { font-family: Georgia, serif; line-height: 1.6; color: #333; max-width: 700px; margin: 0 auto; padding: 20px; }
+    h1, h2, h3, h4, h5, h6 { margin-top: 20px; margin-bottom: 10px; }
+    code { background-color: #f0f0f0; padding: 2px 4px; font-family: monospace; }
+    pre { background-color: #f0f0f0; padding: 10px; }
+    </style>
+    """
+}
+
+# Document wrapper (prefix, suffix) per theme, assembled once at import
+_THEMES = {
+    name: (
+        f"<!DOCTYPE html>\n<html>\n<head>\n<meta charset='utf-8'>\n{css}\n</head>\n<body>\n",
+        "\n</body>\n</html>"
+    )
+    for name, css in _CSS_STYLES.items()
+}
+
+def _collapse_whitespace(match: 're.Match[str]') -> str:
+    return ' ' if match.group(1) else '\n\n'
+
+def _render_inline(text: str, features: Set[str]) -> str:
+    return _MARKDOWN_INLINE_RE.sub(lambda match: _render_markdown_token(match, features), text)
+
+def _render_markdown_token(match: 're.Match[str]', features: Set[str]) -> str:
+    kind = match.lastgroup
+    features.add(_TOKEN_FEATURES[kind])
+    if kind == "fence":
+        return f"<pre><code>{match.group('fence_text')}</code></pre>"
+    if kind == "header":
+        level = len(match.group('header_level'))
+        return f"<h{level}>{_render_inline(match.group('header_text'), features)}</h{level}>"
+    if kind == "code":
+        return f"<code>{match.group('code_text')}</code>"
+    if kind == "img":
+        return f'<img src="{match.group("img_src")}" alt="{match.group("img_alt")}">'
+    if kind == "link":
+        return f'<a href="{match.group("link_href")}">{_render_inline(match.group("link_text"), features)}</a>'
+    if kind in ("strong", "ustrong"):
+        return f"<strong>{_render_inline(match.group(kind + '_text'), features)}</strong>"
+    return f"<em>{_render_inline(match.group(kind + '_text'), features)}</em>"
+
+def _tokenize_words(text: str) -> List[str]:
+    """Lowercase text and split it into word tokens"""
+    return _WORD_RE.findall(text.lower())
+
+@lru_cache(maxsize=_ANALYSIS_CACHE_SIZE)
+def _analyze_impl(text: str, language: str) -> Dict[str, Any]:
+    """Compute text statistics; results are shared, so treat them as read-only"""
+    # Basic counts
+    character_count = len(text)
+    character_count_no_spaces = (
+        character_count - text.count(' ') - text.count('\t') - text.count('\n')
+    )
+    word_count = len(text.split())
+    
+    # Line and paragraph counts
+    line_count = text.count('\n') + 1
+    paragraph_count = sum(1 for _ in _PARAGRAPH_RE.finditer(text))
+    
+    # Sentence count (basic approximation)
+    sentences = _SENTENCE_END_RE.findall(text)
+    sentence_count = len(sentences) if sentences else 1
+    
+    # Word frequency analysis
+    lowered = text.lower()
+    # Count straight from the match iterator so the full token list is
+    # never materialized
+    word_frequency = Counter(map(re.Match.group, _WORD_RE.finditer(lowered)))
+    most_common_words = word_frequency.most_common(10)
+    
+    # Character frequency
+    char_frequency = Counter(lowered)
+    most_common_chars = char_frequency.most_common(10)
+    
+    # Reading time estimation (average 200 WPM)
+    reading_time_minutes = word_count / 200 if word_count > 0 else 0
+    
+    # Average calculations
+    avg_words_per_sentence = word_count / sentence_count if sentence_count > 0 else 0
+    avg_chars_per_word = character_count_no_spaces / word_count if word_count > 0 else 0
+    avg_words_per_paragraph = word_count / paragraph_count if paragraph_count > 0 else 0
+    
+    # Text complexity metrics
+    long_word_count = sum(count for word, count in word_frequency.items() if len(word) > 6)
+    long_word_percentage = (long_word_count / word_count * 100) if word_count > 0 else 0
+    
+    # Unique word ratio
+    unique_words = len(word_frequency)
+    unique_word_ratio = (unique_words / word_count * 100) if word_count > 0 else 0
+    
+    # Detect potential language/encoding issues
+    # Encoding with errors='ignore' drops exactly the non-ASCII code points
+    non_ascii_chars = 0 if text.isascii() else character_count - len(text.encode('ascii', 'ignore'))
+    non_ascii_percentage = (non_ascii_chars / character_count * 100) if character_count > 0 else 0
+    
+    analysis = {
+        "character_count": character_count,
+        "character_count_no_spaces": character_count_no_spaces,
+        "word_count": word_count,
+        "unique_word_count": unique_words,
+        "sentence_count": sentence_count,
+        "paragraph_count": paragraph_count,
+        "line_count": line_count,
+        "reading_time_minutes": round(reading_time_minutes, 1),
+        "averages": {
+            "words_per_sentence": round(avg_words_per_sentence, 1),
+            "characters_per_word": round(avg_chars_per_word, 1),
+            "words_per_paragraph": round(avg_words_per_paragraph, 1)
+        },
+        "complexity": {
+            "long_word_percentage": round(long_word_percentage, 1),
+            "unique_word_ratio": round(unique_word_ratio, 1),
+            "non_ascii_percentage": round(non_ascii_percentage, 1)
+        },
+        "most_common_words": most_common_words,
+        "most_common_characters": most_common_chars,
+        "language": language,
+        "encoding_info": {
+            "has_non_ascii": non_ascii_chars > 0,
+            "non_ascii_count": non_ascii_chars
+        }
+    }
+    
+    logger.info(f"Analyzed text: {word_count} words, {sentence_count} sentences")
+    return analysis
+
+def _sentence_case(text: str) -> str:
+    # Capitalize first letter of each sentence
+    sentences = _SENTENCE_SPLIT_RE.split(text)
+    result = []
+    for i, sentence in enumerate(sentences):
+        if i % 2 == 0 and sentence.strip():  # Text parts (not punctuation)
+            sentence = sentence.strip()
+            if sentence:
+                sentence = sentence[0].upper() + sentence[1:].lower()
+        result.append(sentence)
+    return ''.join(result)
+
+def _camel_case(text: str) -> str:
+    words = _tokenize_words(text)
+    if not words:
+        return text
+    return words[0] + ''.join(word.capitalize() for word in words[1:])
+
+def _pascal_case(text: str) -> str:
+    words = _tokenize_words(text)
+    return ''.join(word.capitalize() for word in words)
+
+def _snake_case(text: str) -> str:
+    words = _tokenize_words(text)
+    return '_'.join(words)
+
+def _kebab_case(text: str) -> str:
+    words = _tokenize_words(text)
+    return '-'.join(words)
+
+# Case converters by transform_case type; unknown types leave text unchanged
+_CASE_DISPATCH = {
+    "upper": str.upper,
+    "lower": str.lower,
+    "title": str.title,
+    "sentence": _sentence_case,
+    "camel": _camel_case,
+    "pascal": _pascal_case,
+    "snake": _snake_case,
+    "kebab": _kebab_case,
+}
+
 class TextProcessor:
     """Service for text transformation and analysis utilities"""
     
     @staticmethod
     def transform_case(text: str, case_type: str) -> str:
         """Transform text case"""
-        if case_type == "upper":
-            return text.upper()
-        elif case_type == "lower":
-            return text.lower()
-        elif case_type == "title":
-            return text.title()
-        elif case_type == "sentence":
-            # Capitalize first letter of each sentence
-            sentences = re.split(r'([.!?]+)', text)
-            result = []
-            for i, sentence in enumerate(sentences):
-                if i % 2 == 0 and sentence.strip():  # Text parts (not punctuation)
-                    sentence = sentence.strip()
-                    if sentence:
-                        sentence = sentence[0].upper() + sentence[1:].lower()
-                result.append(sentence)
-            return ''.join(result)
-        elif case_type == "camel":
-            # Convert to camelCase
-            words = re.findall(r'\w+', text.lower())
-            if not words:
-                return text
-            return words[0] + ''.join(word.capitalize() for word in words[1:])
-        elif case_type == "pascal":
-            # Convert to PascalCase
-            words = re.findall(r'\w+', text.lower())
-            return ''.join(word.capitalize() for word in words)
-        elif case_type == "snake":
-            # Convert to snake_case
-            words = re.findall(r'\w+', text.lower())
-            return '_'.join(words)
-        elif case_type == "kebab":
-            # Convert to kebab-case
-            words = re.findall(r'\w+', text.lower())
-            return '-'.join(words)
-        else:
-            return text
+        converter = _CASE_DISPATCH.get(case_type)
+        return converter(text) if converter else text
     
     @staticmethod
     def normalize_line_endings(text: str, line_ending_type: str) -> str:
         """Normalize line endings"""
-        # First normalize all to \n
-        text = text.replace('\r\n', '\n').replace('\r', '\n')
+        # First normalize all to \n; most input has no \r at all, and the
+        # membership test is far cheaper than two copying replace() passes
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
         
         if line_ending_type == "windows":
             return text.replace('\n', '\r\n')
@@ -68,10 +276,9 @@ class TextProcessor:
     @staticmethod
     def remove_extra_whitespace(text: str) -> str:
         """Remove extra whitespace and normalize spacing"""
-        # Replace multiple spaces with single space
-        text = re.sub(r' +', ' ', text)
-        # Replace multiple newlines with double newline (paragraph break)
-        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+        # In one pass, replace multiple spaces with single space and multiple
+        # newlines with double newline (paragraph break)
+        text = _WHITESPACE_RE.sub(_collapse_whitespace, text)
         # Remove trailing whitespace from lines
         text = '\n'.join(line.rstrip() for line in text.split('\n'))
         return text.strip()
@@ -131,80 +338,9 @@ class TextProcessor:
     def analyze_text(text: str, language: str = "en") -> Dict[str, Any]:
         """Analyze text and provide detailed statistics"""
         try:
-            # Basic counts
-            character_count = len(text)
-            character_count_no_spaces = len(text.replace(' ', '').replace('\t', '').replace('\n', ''))
-            word_count = len(text.split())
-            
-            # Line and paragraph counts
-            lines = text.split('\n')
-            line_count = len(lines)
-            paragraph_count = len([p for p in text.split('\n\n') if p.strip()])
-            
-            # Sentence count (basic approximation)
-            sentence_endings = r'[.!?]+(?:\s|$)'
-            sentences = re.findall(sentence_endings, text)
-            sentence_count = len(sentences) if sentences else 1
-            
-            # Word frequency analysis
-            words = re.findall(r'\b\w+\b', text.lower())
-            word_frequency = Counter(words)
-            most_common_words = word_frequency.most_common(10)
-            
-            # Character frequency
-            char_frequency = Counter(text.lower())
-            most_common_chars = char_frequency.most_common(10)
-            
-            # Reading time estimation (average 200 WPM)
-            reading_time_minutes = word_count / 200 if word_count > 0 else 0
-            
-            # Average calculations
-            avg_words_per_sentence = word_count / sentence_count if sentence_count > 0 else 0
-            avg_chars_per_word = character_count_no_spaces / word_count if word_count > 0 else 0
-            avg_words_per_paragraph = word_count / paragraph_count if paragraph_count > 0 else 0
-            
-            # Text complexity metrics
-            long_words = [word for word in words if len(word) > 6]
-            long_word_percentage = (len(long_words) / word_count * 100) if word_count > 0 else 0
-            
-            # Unique word ratio
-            unique_words = len(set(words))
-            unique_word_ratio = (unique_words / word_count * 100) if word_count > 0 else 0
-            
-            # Detect potential language/encoding issues
-            non_ascii_chars = sum(1 for char in text if ord(char) > 127)
-            non_ascii_percentage = (non_ascii_chars / character_count * 100) if character_count > 0 else 0
-            
-            analysis = {
-                "character_count": character_count,
-                "character_count_no_spaces": character_count_no_spaces,
-                "word_count": word_count,
-                "unique_word_count": unique_words,
-                "sentence_count": sentence_count,
-                "paragraph_count": paragraph_count,
-                "line_count": line_count,
-                "reading_time_minutes": round(reading_time_minutes, 1),
-                "averages": {
-                    "words_per_sentence": round(avg_words_per_sentence, 1),
-                    "characters_per_word": round(avg_chars_per_word, 1),
-                    "words_per_paragraph": round(avg_words_per_paragraph, 1)
-                },
-                "complexity": {
-                    "long_word_percentage": round(long_word_percentage, 1),
-                    "unique_word_ratio": round(unique_word_ratio, 1),
-                    "non_ascii_percentage": round(non_ascii_percentage, 1)
-                },
-                "most_common_words": most_common_words,
-                "most_common_characters": most_common_chars,
-                "language": language,
-                "encoding_info": {
-                    "has_non_ascii": non_ascii_chars > 0,
-                    "non_ascii_count": non_ascii_chars
-                }
-            }
-            
-            logger.info(f"Analyzed text: {word_count} words, {sentence_count} sentences")
-            return analysis
+            # Results are cached by (text, language); hand out a copy so
+            # callers can't mutate the cached entry
+            return copy.deepcopy(_analyze_impl(text, language))
             
         except Exception as e:
             logger.error(f"Text analysis failed: {e}")
@@ -218,32 +354,12 @@ class TextProcessor:
     ) -> Tuple[str, Dict[str, Any]]:
         """Convert Markdown to HTML (basic implementation)"""
         try:
-            html_content = markdown_text
-            
-            # Basic Markdown to HTML conversion
-            # Headers
-            html_content = re.sub(r'^# (.*$)', r'<h1>\1</h1>', html_content, flags=re.MULTILINE)
-            html_content = re.sub(r'^## (.*$)', r'<h2>\1</h2>', html_content, flags=re.MULTILINE)
-            html_content = re.sub(r'^### (.*$)', r'<h3>\1</h3>', html_content, flags=re.MULTILINE)
-            html_content = re.sub(r'^#### (.*$)', r'<h4>\1</h4>', html_content, flags=re.MULTILINE)
-            html_content = re.sub(r'^##### (.*$)', r'<h5>\1</h5>', html_content, flags=re.MULTILINE)
-            html_content = re.sub(r'^###### (.*$)', r'<h6>\1</h6>', html_content, flags=re.MULTILINE)
-            
-            # Bold and italic
-            html_content = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', html_content)
-            html_content = re.sub(r'\*(.*?)\*', r'<em>\1</em>', html_content)
-            html_content = re.sub(r'__(.*?)__', r'<strong>\1</strong>', html_content)
-            html_content = re.sub(r'_(.*?)_', r'<em>\1</em>', html_content)
-            
-            # Code
-            html_content = re.sub(r'`(.*?)`', r'<code>\1</code>', html_content)
-            html_content = re.sub(r'^```(.*?)^```', r'<pre><code>\1</code></pre>', html_content, flags=re.MULTILINE | re.DOTALL)
-            
-            # Links
-            html_content = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<a href="\2">\1</a>', html_content)
-            
-            # Images
-            html_content = re.sub(r'!\[([^\]]*)\]\(([^)]+)\)', r'<img src="\2" alt="\1">', html_content)
+            # Basic Markdown to HTML conversion in a single tokenizing pass,
+            # recording which features were rendered along the way
+            features = set()
+            html_content = _MARKDOWN_RE.sub(
+                lambda match: _render_markdown_token(match, features), markdown_text
+            )
             
             # Lists (basic)
             lines = html_content.split('\n')
@@ -252,23 +368,34 @@ class TextProcessor:
             result_lines = []
             
             for line in lines:
-                if re.match(r'^\s*[-*+]\s+', line):
+                # Most lines are plain paragraphs; only run the list patterns
+                # when the first character could start a list item
+                lead = line[:1]
+                if lead and (lead in '-*+' or lead.isspace() or lead.isdecimal()):
+                    ul_match = _LIST_UL_RE.match(line)
+                    ol_match = None if ul_match else _LIST_OL_RE.match(line)
+                else:
+                    ul_match = ol_match = None
+                
+                if ul_match:
                     if not in_ul:
                         result_lines.append('<ul>')
                         in_ul = True
+                        features.add("lists")
                     if in_ol:
                         result_lines.append('</ol>')
                         in_ol = False
-                    item_text = re.sub(r'^\s*[-*+]\s+', '', line)
+                    item_text = line[ul_match.end():]
                     result_lines.append(f'<li>{item_text}</li>')
-                elif re.match(r'^\s*\d+\.\s+', line):
+                elif ol_match:
                     if not in_ol:
                         result_lines.append('<ol>')
                         in_ol = True
+                        features.add("lists")
                     if in_ul:
                         result_lines.append('</ul>')
                         in_ul = False
-                    item_text = re.sub(r'^\s*\d+\.\s+', '', line)
+                    item_text = line[ol_match.end():]
                     result_lines.append(f'<li>{item_text}</li>')
                 else:
                     if in_ul:
@@ -291,49 +418,11 @@ class TextProcessor:
             html_content = '\n'.join(result_lines)
             
             # Add CSS if requested
-            css_styles = {
-                "github": """
-                <style>
-                body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; line-height: 1.6; color: #333; max-width: 800px; margin: 0 auto; padding: 20px; }
-                h1, h2, h3, h4, h5, h6 { margin-top: 24px; margin-bottom: 16px; font-weight: 600; line-height: 1.25; }
-                h1 { font-size: 2em; border-bottom: 1px solid #eaecef; padding-bottom: 10px; }
-                h2 { font-size: 1.5em; border-bottom: 1px solid #eaecef; padding-bottom: 8px; }
-                code { background-color: #f6f8fa; padding: 2px 4px; border-radius: 3px; font-family: 'SFMono-Regular', Consolas, monospace; }
-                pre { background-color: #f6f8fa; padding: 16px; border-radius: 6px; overflow: auto; }
-                a { color: #0366d6; text-decoration: none; }
-                a:hover { text-decoration: underline; }
-                ul, ol { padding-left: 30px; }
-                li { margin-bottom: 4px; }
-                </style>
-                """,
-                "minimal": """
-                <style>
-                body { font-family: Georgia, serif; line-height: 1.6; color: #333; max-width: 700px; margin: 0 auto; padding: 20px; }
-                h1, h2, h3, h4, h5, h6 { margin-top: 20px; margin-bottom: 10px; }
-                code { background-color: #f0f0f0; padding: 2px 4px; font-family: monospace; }
-                pre { background-color: #f0f0f0; padding: 10px; }
-                </style>
-                """
-            }
-            
             if include_css:
-                css = css_styles.get(theme, css_styles["github"])
-                html_content = f"<!DOCTYPE html>\n<html>\n<head>\n<meta charset='utf-8'>\n{css}\n</head>\n<body>\n{html_content}\n</body>\n</html>"
+                prefix, suffix = _THEMES.get(theme, _THEMES["github"])
+                html_content = prefix + html_content + suffix
             
-            # Count features used
-            features_used = []
-            if re.search(r'<h[1-6]>', html_content):
-                features_used.append("headers")
-            if re.search(r'<(strong|em)>', html_content):
-                features_used.append("emphasis")
-            if re.search(r'<code>', html_content):
-                features_used.append("code")
-            if re.search(r'<a href', html_content):
-                features_used.append("links")
-            if re.search(r'<img src', html_content):
-                features_used.append("images")
-            if re.search(r'<(ul|ol)>', html_content):
-                features_used.append("lists")
+            features_used = [feature for feature in _FEATURE_ORDER if feature in features]
             
             metadata = {
                 "include_css": include_css,
@@ -358,15 +447,26 @@ class TextProcessor:
             file_extension = filename.lower().split('.')[-1] if '.' in filename else ''
             
             if file_extension in ['txt', 'md', 'markdown']:
-                # Try different encodings
-                encodings = ['utf-8', 'utf-16', 'latin-1', 'cp1252']
+                # Pick the encoding from the BOM when there is one, otherwise
+                # try strict UTF-8; latin-1 decodes any byte string, so it is
+                # the final fallback
+                if file_data.isascii():
+                    # Pure ASCII is valid UTF-8 and cannot carry a BOM
+                    encodings = ['ascii']
+                elif file_data.startswith(codecs.BOM_UTF8):
+                    encodings = ['utf-8-sig', 'latin-1']
+                elif file_data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+                    encodings = ['utf-16', 'latin-1']
+                else:
+                    encodings = ['utf-8', 'latin-1']
                 text_content = None
                 used_encoding = None
                 
                 for encoding in encodings:
                     try:
                         text_content = file_data.decode(encoding)
-                        used_encoding = encoding
+                        # ASCII input is reported as UTF-8, as before
+                        used_encoding = 'utf-8' if encoding == 'ascii' else encoding
                         break
                     except UnicodeDecodeError:
                         continue
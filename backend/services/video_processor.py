@@ -1,25 +1,480 @@
 import io
 import tempfile
 import os
-from typing import Dict, Any, Optional, Tuple, List
+import re
+import shutil
+import stat
+import subprocess
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Tuple, List, Union, BinaryIO, Callable, Iterator
 from pathlib import Path
+from functools import lru_cache, partial, wraps
 import ffmpeg
 import logging
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 from .progress_tracker import progress_tracker
+from .mp4_probe import probe_mp4
 
 logger = logging.getLogger(__name__)
 
+# Video input as raw bytes, a path on disk, or a file-like upload
+VideoSource = Union[bytes, str, Path, BinaryIO]
+
+# Hardware H.264 encoders by VIDEO_HWACCEL backend:
+# (encoder, device node, option that replaces x264's crf)
+_HW_ENCODERS = {
+    'cuda': ('h264_nvenc', '/dev/nvidia0', 'cq'),
+    'vaapi': ('h264_vaapi', '/dev/dri/renderD128', 'qp'),
+    'qsv': ('h264_qsv', '/dev/dri/renderD128', 'global_quality'),
+}
+
+# libx264 speed/size tradeoffs a request may pick
+X264_PRESETS = (
+    'ultrafast', 'superfast', 'veryfast', 'faster', 'fast',
+    'medium', 'slow', 'slower', 'veryslow'
+)
+
+# Codec names the default encoders produce for each output format, so a
+# source that already uses them can be remuxed: (video, audio)
+_DEFAULT_CODEC_NAMES = {
+    'mp4': ('h264', 'aac'),
+    'mov': ('h264', 'aac'),
+    'mkv': ('h264', 'aac'),
+    'avi': ('h264', 'mp3'),
+    'webm': ('vp9', 'vorbis'),
+}
+
+# Image encoders for piped stills; image2pipe can't infer one from a filename
+_IMAGE_CODECS = {
+    'jpg': 'mjpeg',
+    'jpeg': 'mjpeg',
+    'png': 'png',
+    'webp': 'libwebp',
+}
+
+# FFmpeg's own report of an encode: the output stream lines it logs before
+# encoding and the -progress blocks it writes while running
+_OUTPUT_STREAM_RE = re.compile(r'^\s*Stream #0:\d+\S*: (Video|Audio): (\w+)(.*)$', re.MULTILINE)
+_RESOLUTION_RE = re.compile(r', (\d+)x(\d+)')
+_FPS_RE = re.compile(r', ([\d.]+) fps')
+_INPUT_DURATION_RE = re.compile(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)')
+_OUT_TIME_RE = re.compile(r'^out_time_us=(\d+)$', re.MULTILINE)
+_PROGRESS_ARGS = ('-progress', 'pipe:2', '-nostats', '-stats_period', '5')
+
+def _parse_encode_stats(stderr: bytes) -> Dict[str, Any]:
+    """Read output codecs, resolution, fps and duration from an FFmpeg log"""
+    log = stderr.decode('utf-8', 'replace')
+    output_start = log.find('Output #0')
+    output_section = log[output_start:] if output_start >= 0 else ''
+    
+    stats = {
+        'video_codec': 'none',
+        'audio_codec': 'none',
+        'resolution': 'unknown',
+        'fps': 'unknown',
+        'duration': 0.0
+    }
+    for kind, codec, details in _OUTPUT_STREAM_RE.findall(output_section):
+        if kind == 'Video' and stats['video_codec'] == 'none':
+            stats['video_codec'] = codec
+            size = _RESOLUTION_RE.search(details)
+            if size:
+                stats['resolution'] = f"{size.group(1)}x{size.group(2)}"
+            fps = _FPS_RE.search(details)
+            if fps:
+                stats['fps'] = fps.group(1)
+        elif kind == 'Audio' and stats['audio_codec'] == 'none':
+            stats['audio_codec'] = codec
+    
+    out_times = _OUT_TIME_RE.findall(log)
+    if out_times:
+        stats['duration'] = int(out_times[-1]) / 1_000_000
+    return stats
+
+def _png_end(data: bytes, pos: int) -> int:
+    """Offset just past the PNG starting at pos, or -1 if it is truncated.
+    
+    Walks the chunks (length, type, data, CRC) rather than searching for
+    b'IEND', which can also occur inside compressed IDAT data.
+    """
+    pos += 8  # Signature
+    while pos + 8 <= len(data):
+        length = int.from_bytes(data[pos:pos + 4], 'big')
+        chunk_type = data[pos + 4:pos + 8]
+        pos += 12 + length
+        if chunk_type == b'IEND':
+            return pos
+    return -1
+
+def _split_image_stream(data: bytes, vcodec: str) -> List[bytes]:
+    """Cut concatenated image2pipe output back into individual images"""
+    frames = []
+    pos = 0
+    while pos < len(data):
+        if vcodec == 'png':
+            end = _png_end(data, pos)
+        elif vcodec == 'libwebp':
+            # RIFF container: 8-byte header followed by the declared size
+            end = pos + 8 + int.from_bytes(data[pos + 4:pos + 8], 'little')
+        else:
+            # JPEG entropy data escapes 0xFF, so FFD9 only appears as EOI
+            end = data.find(b'\xff\xd9', pos)
+            end = end + 2 if end >= 0 else -1
+        if end < 0 or end > len(data):
+            break
+        frames.append(data[pos:end])
+        pos = end
+    return frames
+
+def _parse_input_duration(stderr: bytes) -> float:
+    """Read the input duration FFmpeg logs when it opens a file, or 0.0"""
+    match = _INPUT_DURATION_RE.search(stderr.decode('utf-8', 'replace'))
+    if not match:
+        return 0.0
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+def _remux_codecs(output_format: str) -> Tuple[Tuple[str, str], ...]:
+    """Source (video, audio) codec pairs that can be stream-copied into output_format"""
+    if output_format not in _DEFAULT_CODEC_NAMES:
+        return ()
+    video_codec, audio_codec = _DEFAULT_CODEC_NAMES[output_format]
+    return (video_codec, audio_codec), (video_codec, 'none')
+
+def _source_codecs(input_path: str) -> Optional[Tuple[str, str]]:
+    """(video, audio) codec names of the input, or None if it can't be probed"""
+    try:
+        probe = probe_mp4(input_path) or ffmpeg.probe(input_path)
+    except ffmpeg.Error:
+        return None
+    def first_codec(codec_type: str) -> str:
+        return next(
+            (s.get('codec_name', 'unknown') for s in probe['streams'] if s.get('codec_type') == codec_type),
+            'none'
+        )
+    return first_codec('video'), first_codec('audio')
+
+def _memfd_with_bytes(data: bytes) -> Tuple[Optional[int], str]:
+    """Stage video bytes where FFmpeg can open and seek them.
+    
+    On Linux the data goes into an anonymous memfd, so there is no directory
+    entry to create or unlink and the memory is reclaimed on close; other
+    platforms fall back to a named temp file. Returns (fd or None, path);
+    hand both to _release_input when done.
+    """
+    if not hasattr(os, 'memfd_create'):
+        with tempfile.NamedTemporaryFile(delete=False) as input_file:
+            input_file.write(data)
+        return None, input_file.name
+    
+    fd = os.memfd_create('video', os.MFD_CLOEXEC)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    except BaseException:
+        os.close(fd)
+        raise
+    # FFmpeg runs as a child that doesn't inherit the fd, so point it at
+    # this process's descriptor
+    return fd, f'/proc/{os.getpid()}/fd/{fd}'
+
+def _memfd_with_stream(stream: BinaryIO) -> Tuple[Optional[int], str]:
+    """Stage a file-like upload like _memfd_with_bytes, copying it in chunks
+    rather than reading the whole upload into one bytes object first.
+    """
+    if not hasattr(os, 'memfd_create'):
+        with tempfile.NamedTemporaryFile(delete=False) as input_file:
+            shutil.copyfileobj(stream, input_file)
+        return None, input_file.name
+    
+    fd = os.memfd_create('video', os.MFD_CLOEXEC)
+    try:
+        with open(fd, 'wb', closefd=False) as staged:
+            shutil.copyfileobj(stream, staged)
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd, f'/proc/{os.getpid()}/fd/{fd}'
+
+def _disk_backed_fd(stream: BinaryIO) -> Optional[int]:
+    """Descriptor of a stream already backed by a regular file, or None.
+    
+    Starlette spools uploads over 1 MB to a temp file; FFmpeg can read that
+    file where it is instead of it being copied into memory. A spool still
+    held in memory is left alone, since fileno() would force it to disk.
+    """
+    if isinstance(stream, tempfile.SpooledTemporaryFile) and not stream._rolled:
+        return None
+    try:
+        fd = stream.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+    if not stat.S_ISREG(os.fstat(fd).st_mode) or not os.path.isdir('/proc/self/fd'):
+        return None
+    return fd
+
+def _release_input(fd: Optional[int], path: str) -> None:
+    """Free input staged by _memfd_with_bytes"""
+    try:
+        if fd is not None:
+            os.close(fd)
+        else:
+            os.unlink(path)
+    except OSError:
+        pass
+
+def _open_source(source: VideoSource) -> Tuple[str, Callable[[], None]]:
+    """Give FFmpeg a path for any accepted video source.
+    
+    Paths and uploads already spooled to disk are used in place; bytes and
+    in-memory uploads are staged in a memfd. Returns (path, release); call
+    release() when done.
+    """
+    if isinstance(source, (str, Path)):
+        return str(source), lambda: None
+    if not isinstance(source, (bytes, bytearray, memoryview)):
+        fd = _disk_backed_fd(source)
+        if fd is not None:
+            # Reopening through /proc reads the file from the start; the
+            # descriptor stays owned by the caller
+            return f'/proc/{os.getpid()}/fd/{fd}', lambda: None
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        fd, path = _memfd_with_bytes(source)
+    else:
+        fd, path = _memfd_with_stream(source)
+    return path, lambda: _release_input(fd, path)
+
+@lru_cache(maxsize=1)
+def _probe_capabilities() -> Tuple[frozenset, frozenset]:
+    """List the encoders and hwaccels built into FFmpeg, once per process"""
+    def ffmpeg_list(option: str) -> List[str]:
+        return subprocess.run(
+            ['ffmpeg', '-hide_banner', option],
+            capture_output=True, text=True, check=True
+        ).stdout.splitlines()
+    
+    try:
+        encoder_lines = ffmpeg_list('-encoders')
+        hwaccel_lines = ffmpeg_list('-hwaccels')
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.warning(f"Could not query FFmpeg capabilities: {e}")
+        return frozenset(), frozenset()
+    
+    # Encoders follow a '------' rule as '<flags> <name> <description>';
+    # hwaccels are one name per line after a heading
+    rule = next((i for i, line in enumerate(encoder_lines) if line.strip().startswith('---')), -1)
+    encoders = frozenset(
+        line.split()[1] for line in encoder_lines[rule + 1:] if len(line.split()) > 1
+    )
+    hwaccels = frozenset(line.strip() for line in hwaccel_lines[1:] if line.strip())
+    return encoders, hwaccels
+
+def _detect_hwaccel() -> Optional[str]:
+    """Pick a hardware H.264 backend, or None to encode with libx264.
+    
+    VIDEO_HWACCEL selects a backend ('cuda', 'vaapi', 'qsv') or disables
+    hardware encoding ('none'). The default, 'auto', uses the first backend
+    whose encoder and hwaccel are built into FFmpeg and whose device node
+    exists.
+    """
+    requested = os.getenv('VIDEO_HWACCEL', 'auto').lower()
+    if requested == 'none':
+        return None
+    candidates = [requested] if requested in _HW_ENCODERS else list(_HW_ENCODERS)
+    
+    encoders, hwaccels = _probe_capabilities()
+    for backend in candidates:
+        encoder, device, _ = _HW_ENCODERS[backend]
+        if encoder in encoders and backend in hwaccels and os.path.exists(device):
+            logger.info(f"Using {encoder} for H.264 encoding")
+            return backend
+    return None
+
+def _software_encoder_args(vcodec: Optional[str], preset: str, threads: int) -> Dict[str, Any]:
+    """Threading and speed options for FFmpeg's CPU encoders"""
+    if vcodec == 'libx264':
+        return {'threads': threads, 'preset': preset}
+    if vcodec == 'libvpx-vp9':
+        # VP9 only uses more than a few cores with row-based multithreading
+        return {'threads': threads, 'row-mt': 1, 'cpu-used': 4}
+    return {}
+
+def _scale_filter(scale_args: str) -> str:
+    """Scale chain for encodes: fast_bilinear resampling, then the encoder's pixel format"""
+    # Naming yuv420p here lets swscale convert while it scales rather than
+    # FFmpeg negotiating a separate conversion for the encoder
+    return f'scale={scale_args}:flags=fast_bilinear,format=yuv420p'
+
+def _hwaccel_decode_args(hwaccel: str) -> Dict[str, Any]:
+    """Input args that decode on a hardware backend"""
+    input_args = {'hwaccel': hwaccel}
+    if hwaccel == 'vaapi':
+        input_args['hwaccel_device'] = _HW_ENCODERS[hwaccel][1]
+    return input_args
+
+def _hwaccel_args(hwaccel: str, output_args: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Translate libx264 output args into (input_args, output_args) for a hardware backend"""
+    encoder, device, quality_option = _HW_ENCODERS[hwaccel]
+    output_args = {**output_args, 'vcodec': encoder}
+    if 'crf' in output_args:
+        output_args[quality_option] = output_args.pop('crf')
+    
+    input_args = {'hwaccel': hwaccel}
+    if hwaccel == 'vaapi':
+        # The VAAPI encoder only takes GPU surfaces; upload whatever the
+        # decoder or software filters produce
+        input_args['vaapi_device'] = device
+        vf = output_args.get('vf')
+        output_args['vf'] = f'{vf},format=nv12|vaapi,hwupload' if vf else 'format=nv12|vaapi,hwupload'
+        if not vf:
+            input_args['hwaccel_output_format'] = 'vaapi'
+    elif 'vf' not in output_args:
+        # Without software filters, keep decoded frames on the GPU
+        input_args['hwaccel_output_format'] = hwaccel
+    return input_args, output_args
+
+def _run_in(pool: str, failure: Optional[str] = None):
+    """Expose a blocking VideoProcessor method as a coroutine run on the named pool.
+    
+    With a failure message, errors are logged before being re-raised.
+    """
+    def decorator(method: Callable) -> Callable:
+        @wraps(method)
+        async def run(self, *args, **kwargs):
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    getattr(self, pool), partial(method, self, *args, **kwargs)
+                )
+            except Exception as e:
+                if failure:
+                    logger.error(f"{failure}: {e}")
+                raise
+        return run
+    return decorator
+
 class VideoProcessor:
     """Server-side video processing service using FFmpeg"""
     
     def __init__(self):
-        self.executor = ThreadPoolExecutor(max_workers=2)  # Video processing is CPU intensive
+        # Encodes are CPU bound, so keep that pool bounded; probes and single
+        # thumbnails are short and get their own pool so they don't queue
+        # behind multi-minute encodes
+        self.cpu_count = os.cpu_count() or 2
+        self.encode_pool = ThreadPoolExecutor(max_workers=max(self.cpu_count // 2, 1))
+        self._active_encodes = 0
+        self._encode_lock = threading.Lock()
+        self.probe_executor = ThreadPoolExecutor(max_workers=16)
+        self.hwaccel = _detect_hwaccel()
+        self.preset = os.getenv('VIDEO_X264_PRESET', 'fast')
+        # Outputs above this are handed back as a file path instead of bytes
+        self.max_in_memory_mb = int(os.getenv('VIDEO_MAX_IN_MEMORY_MB', '256'))
+    
+    def _read_output(self, output_path: str) -> Union[bytes, str]:
+        """Read an encode's output, or return its path if it is too big to hold in memory.
+        
+        A returned path is owned by the caller, who must stream and delete it.
+        """
+        if os.path.getsize(output_path) > self.max_in_memory_mb * 1024 * 1024:
+            return output_path
+        with open(output_path, 'rb') as f:
+            return f.read()
+    
+    @contextmanager
+    def _encode_threads(self) -> Iterator[int]:
+        """Register a running software encode and yield its encoder thread count.
+        
+        A lone encode gets threads=0 so the encoder uses every core; encodes
+        that overlap split the cores between them instead of each spawning
+        one thread per core.
+        """
+        with self._encode_lock:
+            self._active_encodes += 1
+            active = self._active_encodes
+        try:
+            yield 0 if active == 1 else max(self.cpu_count // active, 1)
+        finally:
+            with self._encode_lock:
+                self._active_encodes -= 1
+    
+    def _run_encode(
+        self,
+        input_path: str,
+        output_path: str,
+        output_args: Dict[str, Any],
+        hwaccel: Optional[str],
+        preset: str
+    ) -> Dict[str, Any]:
+        """Run an H.264 encode on the hardware backend, falling back to libx264.
+        
+        Returns the output stats FFmpeg reported, so callers don't need to
+        probe the result.
+        """
+        if hwaccel:
+            hw_input_args, hw_output_args = _hwaccel_args(hwaccel, output_args)
+            try:
+                stream = ffmpeg.output(ffmpeg.input(input_path, **hw_input_args), output_path, **hw_output_args)
+                _, stderr = ffmpeg.run(stream.global_args(*_PROGRESS_ARGS), overwrite_output=True, quiet=True)
+                return _parse_encode_stats(stderr)
+            except ffmpeg.Error as e:
+                logger.warning(f"Hardware encoding with {hwaccel} failed, using libx264: {e}")
+        
+        with self._encode_threads() as threads:
+            output_args = {**output_args, **_software_encoder_args(output_args.get('vcodec'), preset, threads)}
+            stream = ffmpeg.output(ffmpeg.input(input_path), output_path, **output_args)
+            _, stderr = ffmpeg.run(stream.global_args(*_PROGRESS_ARGS), overwrite_output=True, quiet=True)
+        return _parse_encode_stats(stderr)
+    
+    def _run_remux(self, input_path: str, output_path: str, movflags: Optional[str]) -> Dict[str, Any]:
+        """Stream-copy the first video and audio track into a new container.
+        
+        Only those two tracks are mapped: subtitle, data and attachment
+        streams often have no equivalent in the target container.
+        """
+        source = ffmpeg.input(input_path)
+        extra_args = {'movflags': movflags} if movflags else {}
+        stream = ffmpeg.output(source['v:0'], source['a:0?'], output_path, c='copy', **extra_args)
+        _, stderr = ffmpeg.run(stream.global_args(*_PROGRESS_ARGS), overwrite_output=True, quiet=True)
+        return _parse_encode_stats(stderr)
+    
+    def _run_two_pass(
+        self,
+        input_path: str,
+        output_path: str,
+        output_args: Dict[str, Any],
+        preset: str
+    ) -> Dict[str, Any]:
+        """Two-pass libx264 ABR encode, so a bitrate budget lands on the hard scenes"""
+        with self._encode_threads() as threads:
+            output_args = {**output_args, **_software_encoder_args(output_args.get('vcodec'), preset, threads)}
+            
+            # The pass log (and x264's .mbtree) go away with the directory
+            with tempfile.TemporaryDirectory() as pass_dir:
+                pass_args = {'passlogfile': os.path.join(pass_dir, 'ffmpeg2pass')}
+            
+                # First pass only collects stats: no audio, output discarded
+                first_pass_args = {
+                    key: value for key, value in output_args.items()
+                    if key not in ('acodec', 'audio_bitrate', 'movflags')
+                }
+                stream = ffmpeg.output(
+                    ffmpeg.input(input_path), os.devnull,
+                    an=None, f='null', **first_pass_args, **pass_args, **{'pass': 1}
+                )
+                ffmpeg.run(stream, overwrite_output=True, quiet=True)
+            
+                stream = ffmpeg.output(
+                    ffmpeg.input(input_path), output_path,
+                    **output_args, **pass_args, **{'pass': 2}
+                )
+                _, stderr = ffmpeg.run(stream.global_args(*_PROGRESS_ARGS), overwrite_output=True, quiet=True)
+        return _parse_encode_stats(stderr)
     
     async def convert_format(
         self,
-        video_data: bytes,
+        source: VideoSource,
         output_format: str,
         quality: str = 'medium',
         resolution: Optional[str] = None,
@@ -27,9 +482,14 @@ class VideoProcessor:
         video_codec: Optional[str] = None,
         audio_codec: Optional[str] = None,
         task_id: Optional[str] = None,
-        filename: Optional[str] = None
-    ) -> Tuple[bytes, Dict[str, Any]]:
-        """Convert video between formats using FFmpeg"""
+        filename: Optional[str] = None,
+        preset: Optional[str] = None
+    ) -> Tuple[Union[bytes, str], Dict[str, Any]]:
+        """Convert video between formats using FFmpeg
+        
+        Outputs above max_in_memory_mb come back as a file path to stream
+        and delete rather than as bytes.
+        """
         try:
             # Create progress tracking if task_id provided
             if task_id and filename:
@@ -42,17 +502,16 @@ class VideoProcessor:
                 )
                 progress_tracker.update_progress(task_id, 5, "Starting video conversion...")
             
-            result = await asyncio.get_event_loop().run_in_executor(
-                self.executor,
-                self._convert_video_sync,
-                video_data,
+            result = await self._convert_video(
+                source,
                 output_format,
                 quality,
                 resolution,
                 fps,
                 video_codec,
                 audio_codec,
-                task_id
+                task_id,
+                preset
             )
             
             if task_id:
@@ -66,22 +525,23 @@ class VideoProcessor:
             logger.error(f"Video format conversion failed: {e}")
             raise
     
-    def _convert_video_sync(
+    @_run_in('encode_pool')
+    def _convert_video(
         self,
-        video_data: bytes,
+        source: VideoSource,
         output_format: str,
         quality: str,
         resolution: Optional[str],
         fps: Optional[int],
         video_codec: Optional[str],
         audio_codec: Optional[str],
-        task_id: Optional[str] = None
-    ) -> Tuple[bytes, Dict[str, Any]]:
+        task_id: Optional[str] = None,
+        preset: Optional[str] = None
+    ) -> Tuple[Union[bytes, str], Dict[str, Any]]:
         """Synchronous video conversion using FFmpeg"""
         
-        with tempfile.NamedTemporaryFile(delete=False) as input_file:
-            input_file.write(video_data)
-            input_path = input_file.name
+        input_path, release_input = _open_source(source)
+        converted_data = None
         
         with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{output_format}') as output_file:
             output_path = output_file.name
@@ -90,14 +550,19 @@ class VideoProcessor:
             if task_id:
                 progress_tracker.update_progress(task_id, 10, "Analyzing video file...")
             
-            stream = ffmpeg.input(input_path)
+            # Anything beyond the format's defaults needs a real encode
+            transcode_requested = bool(video_codec or audio_codec or resolution or fps) or quality != 'medium'
             
             # Video encoding settings
             video_args = {}
             audio_args = {}
+            hwaccel = None
             
             # Set video codec
             if not video_codec:
+                # Default H.264 encodes can move to the GPU
+                if output_format.lower() != 'webm':
+                    hwaccel = self.hwaccel
                 if output_format.lower() in ['mp4', 'mov']:
                     video_codec = 'libx264'
                 elif output_format.lower() == 'webm':
@@ -138,7 +603,7 @@ class VideoProcessor:
             
             # Resolution scaling
             if resolution:
-                video_args['vf'] = f'scale={resolution}'
+                video_args['vf'] = _scale_filter(resolution)
             
             # Frame rate
             if fps:
@@ -147,84 +612,77 @@ class VideoProcessor:
             # Combine arguments
             output_args = {**video_args, **audio_args}
             
+            # Write the moov index up front so players can start before the
+            # whole file has downloaded
+            if output_format.lower() in ['mp4', 'mov']:
+                output_args['movflags'] = '+faststart'
+            
             if task_id:
                 progress_tracker.update_progress(task_id, 30, "Starting video encoding...")
             
-            stream = ffmpeg.output(stream, output_path, **output_args)
-            ffmpeg.run(stream, overwrite_output=True, quiet=True)
+            stats = None
+            # Source already has the codecs this format defaults to: remux
+            remux_codecs = () if transcode_requested else _remux_codecs(output_format.lower())
+            if remux_codecs and _source_codecs(input_path) in remux_codecs:
+                logger.info(f"Source already matches {output_format.upper()} defaults, copying streams")
+                try:
+                    stats = self._run_remux(input_path, output_path, output_args.get('movflags'))
+                except ffmpeg.Error as e:
+                    logger.warning(f"Stream copy to {output_format.upper()} failed, re-encoding: {e}")
+            
+            if stats is None:
+                stats = self._run_encode(input_path, output_path, output_args, hwaccel, preset or self.preset)
             
             if task_id:
                 progress_tracker.update_progress(task_id, 90, "Finalizing video conversion...")
             
-            # Read converted video
-            with open(output_path, 'rb') as f:
-                converted_data = f.read()
-            
-            # Get video info
-            probe = ffmpeg.probe(output_path)
-            video_stream = next((s for s in probe['streams'] if s['codec_type'] == 'video'), None)
-            audio_stream = next((s for s in probe['streams'] if s['codec_type'] == 'audio'), None)
+            # Read converted video; large outputs stay on disk for the caller
+            converted_data = self._read_output(output_path)
+            size = os.path.getsize(output_path)
             
+            # Video info comes from FFmpeg's own log of the encode
+            duration = stats['duration']
             metadata = {
                 'format': output_format,
-                'duration': float(probe['format']['duration']),
-                'size': len(converted_data),
+                'duration': duration,
+                'size': size,
                 'quality': quality,
-                'video_codec': video_stream.get('codec_name', 'unknown') if video_stream else 'none',
-                'audio_codec': audio_stream.get('codec_name', 'unknown') if audio_stream else 'none',
-                'resolution': f"{video_stream.get('width', 'unknown')}x{video_stream.get('height', 'unknown')}" if video_stream else 'unknown',
-                'fps': video_stream.get('r_frame_rate', 'unknown') if video_stream else 'unknown',
-                'bitrate': probe['format'].get('bit_rate', 'unknown')
+                'video_codec': stats['video_codec'],
+                'audio_codec': stats['audio_codec'],
+                'resolution': stats['resolution'],
+                'fps': stats['fps'],
+                'bitrate': str(int(size * 8 / duration)) if duration else 'unknown'
             }
             
             logger.info(f"Converted video to {output_format.upper()}, duration: {metadata['duration']:.2f}s")
             return converted_data, metadata
             
         finally:
-            try:
-                os.unlink(input_path)
-                os.unlink(output_path)
-            except OSError:
-                pass
+            release_input()
+            if converted_data is not output_path:
+                try:
+                    os.unlink(output_path)
+                except OSError:
+                    pass
     
-    async def compress_video(
+    @_run_in('encode_pool', "Video compression failed")
+    def compress_video(
         self,
-        video_data: bytes,
+        source: VideoSource,
         compression_level: str = 'medium',
         target_size_mb: Optional[int] = None,
         max_resolution: Optional[str] = None,
-        max_bitrate: Optional[str] = None
-    ) -> Tuple[bytes, Dict[str, Any]]:
-        """Compress video file"""
-        try:
-            result = await asyncio.get_event_loop().run_in_executor(
-                self.executor,
-                self._compress_video_sync,
-                video_data,
-                compression_level,
-                target_size_mb,
-                max_resolution,
-                max_bitrate
-            )
-            return result
-            
-        except Exception as e:
-            logger.error(f"Video compression failed: {e}")
-            raise
-    
-    def _compress_video_sync(
-        self,
-        video_data: bytes,
-        compression_level: str,
-        target_size_mb: Optional[int],
-        max_resolution: Optional[str],
-        max_bitrate: Optional[str]
-    ) -> Tuple[bytes, Dict[str, Any]]:
-        """Synchronous video compression"""
+        max_bitrate: Optional[str] = None,
+        preset: Optional[str] = None
+    ) -> Tuple[Union[bytes, str], Dict[str, Any]]:
+        """Compress video file
         
-        with tempfile.NamedTemporaryFile(delete=False) as input_file:
-            input_file.write(video_data)
-            input_path = input_file.name
+        Outputs above max_in_memory_mb come back as a file path to stream
+        and delete rather than as bytes.
+        """
+        
+        input_path, release_input = _open_source(source)
+        compressed_data = None
         
         with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as output_file:
             output_path = output_file.name
@@ -233,12 +691,10 @@ class VideoProcessor:
             # Get original video info
             original_probe = ffmpeg.probe(input_path)
             original_duration = float(original_probe['format']['duration'])
-            original_size = len(video_data)
-            
-            stream = ffmpeg.input(input_path)
+            original_size = os.path.getsize(input_path)
             
-            # Compression settings
-            video_args = {'vcodec': 'libx264', 'acodec': 'aac'}
+            # Compression settings; moov goes up front for progressive playback
+            video_args = {'vcodec': 'libx264', 'acodec': 'aac', 'movflags': '+faststart'}
             
             # Set CRF based on compression level
             if compression_level == 'low':
@@ -253,41 +709,42 @@ class VideoProcessor:
             
             # Target size calculation (two-pass encoding)
             if target_size_mb:
-                target_bitrate = int((target_size_mb * 8 * 1024) / original_duration)  # kbps
+                # Leave room for the audio track in the size budget
+                audio_kbps = int(video_args.get('audio_bitrate', '0k').rstrip('k'))
+                target_bitrate = max(int((target_size_mb * 8 * 1024) / original_duration) - audio_kbps, 1)  # kbps
                 video_args['b:v'] = f'{target_bitrate}k'
                 video_args.pop('crf', None)  # Remove CRF when using target bitrate
             
             # Resolution scaling
             if max_resolution:
-                video_args['vf'] = f'scale={max_resolution}:force_original_aspect_ratio=decrease'
+                video_args['vf'] = _scale_filter(f'{max_resolution}:force_original_aspect_ratio=decrease')
             
             # Max bitrate
             if max_bitrate:
                 video_args['maxrate'] = max_bitrate
                 video_args['bufsize'] = f'{int(max_bitrate.rstrip("k")) * 2}k'
             
-            stream = ffmpeg.output(stream, output_path, **video_args)
-            ffmpeg.run(stream, overwrite_output=True, quiet=True)
-            
-            # Read compressed video
-            with open(output_path, 'rb') as f:
-                compressed_data = f.read()
+            preset = preset or self.preset
+            if target_size_mb:
+                stats = self._run_two_pass(input_path, output_path, video_args, preset)
+            else:
+                stats = self._run_encode(input_path, output_path, video_args, self.hwaccel, preset)
             
-            compressed_size = len(compressed_data)
+            # Read compressed video; large outputs stay on disk for the caller
+            compressed_data = self._read_output(output_path)
+            compressed_size = os.path.getsize(output_path)
             compression_ratio = ((original_size - compressed_size) / original_size) * 100
             
-            # Get compressed video info
-            probe = ffmpeg.probe(output_path)
-            video_stream = next((s for s in probe['streams'] if s['codec_type'] == 'video'), None)
-            
+            # Compressed video info comes from FFmpeg's own log of the encode
+            duration = stats['duration']
             metadata = {
                 'original_size_mb': round(original_size / (1024 * 1024), 2),
                 'compressed_size_mb': round(compressed_size / (1024 * 1024), 2),
                 'compression_ratio': round(compression_ratio, 1),
                 'compression_level': compression_level,
-                'duration': float(probe['format']['duration']),
-                'resolution': f"{video_stream.get('width', 'unknown')}x{video_stream.get('height', 'unknown')}" if video_stream else 'unknown',
-                'bitrate': probe['format'].get('bit_rate', 'unknown'),
+                'duration': duration,
+                'resolution': stats['resolution'],
+                'bitrate': str(int(compressed_size * 8 / duration)) if duration else 'unknown',
                 'target_size_mb': target_size_mb,
                 'max_resolution': max_resolution
             }
@@ -296,76 +753,51 @@ class VideoProcessor:
             return compressed_data, metadata
             
         finally:
-            try:
-                os.unlink(input_path)
-                os.unlink(output_path)
-            except OSError:
-                pass
+            release_input()
+            if compressed_data is not output_path:
+                try:
+                    os.unlink(output_path)
+                except OSError:
+                    pass
     
-    async def generate_thumbnail(
+    @_run_in('probe_executor', "Thumbnail generation failed")
+    def generate_thumbnail(
         self,
-        video_data: bytes,
+        source: VideoSource,
         timestamp: float = 10.0,
         width: int = 320,
         height: int = 240,
         format: str = 'jpg'
     ) -> Tuple[bytes, Dict[str, Any]]:
         """Generate thumbnail from video at specified timestamp"""
-        try:
-            result = await asyncio.get_event_loop().run_in_executor(
-                self.executor,
-                self._generate_thumbnail_sync,
-                video_data,
-                timestamp,
-                width,
-                height,
-                format
-            )
-            return result
-            
-        except Exception as e:
-            logger.error(f"Thumbnail generation failed: {e}")
-            raise
-    
-    def _generate_thumbnail_sync(
-        self,
-        video_data: bytes,
-        timestamp: float,
-        width: int,
-        height: int,
-        format: str
-    ) -> Tuple[bytes, Dict[str, Any]]:
-        """Synchronous thumbnail generation"""
-        
-        with tempfile.NamedTemporaryFile(delete=False) as input_file:
-            input_file.write(video_data)
-            input_path = input_file.name
         
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{format}') as output_file:
-            output_path = output_file.name
+        input_path, release_input = _open_source(source)
         
-        try:
-            # Get video duration to validate timestamp
-            probe = ffmpeg.probe(input_path)
-            duration = float(probe['format']['duration'])
-            
-            # Adjust timestamp if it exceeds video duration
-            if timestamp >= duration:
-                timestamp = duration / 2  # Use middle of video
-            
-            stream = ffmpeg.input(input_path, ss=timestamp)
+        def grab_frame(seek: float) -> Tuple[bytes, bytes]:
+            # Encode the frame straight to stdout instead of a temp file
+            stream = ffmpeg.input(input_path, ss=seek)
             stream = ffmpeg.output(
                 stream,
-                output_path,
+                'pipe:1',
                 vframes=1,  # Extract single frame
                 vf=f'scale={width}:{height}',
-                format='image2'
+                format='image2pipe',
+                vcodec=_IMAGE_CODECS.get(format.lower(), 'mjpeg')
             )
-            ffmpeg.run(stream, overwrite_output=True, quiet=True)
+            return ffmpeg.run(stream, quiet=True)
+        
+        try:
+            # Seek without probing first; FFmpeg logs the duration as it opens
+            # the input, which is enough to recover from a seek past the end
+            thumbnail_data, stderr = grab_frame(timestamp)
+            duration = _parse_input_duration(stderr)
+            
+            if not thumbnail_data and duration and timestamp >= duration:
+                timestamp = duration / 2  # Use middle of video
+                thumbnail_data, _ = grab_frame(timestamp)
             
-            # Read thumbnail
-            with open(output_path, 'rb') as f:
-                thumbnail_data = f.read()
+            if not thumbnail_data:
+                raise ValueError(f"No video frame found at {timestamp}s")
             
             metadata = {
                 'timestamp': timestamp,
@@ -380,122 +812,78 @@ class VideoProcessor:
             return thumbnail_data, metadata
             
         finally:
-            try:
-                os.unlink(input_path)
-                os.unlink(output_path)
-            except OSError:
-                pass
+            release_input()
     
-    async def extract_frames(
+    @_run_in('encode_pool', "Frame extraction failed")
+    def extract_frames(
         self,
-        video_data: bytes,
+        source: VideoSource,
         fps: float = 1.0,
         start_time: Optional[float] = None,
         duration: Optional[float] = None,
         format: str = 'jpg'
     ) -> Tuple[List[bytes], Dict[str, Any]]:
         """Extract frames from video at specified intervals"""
-        try:
-            result = await asyncio.get_event_loop().run_in_executor(
-                self.executor,
-                self._extract_frames_sync,
-                video_data,
-                fps,
-                start_time,
-                duration,
-                format
-            )
-            return result
-            
-        except Exception as e:
-            logger.error(f"Frame extraction failed: {e}")
-            raise
-    
-    def _extract_frames_sync(
-        self,
-        video_data: bytes,
-        fps: float,
-        start_time: Optional[float],
-        duration: Optional[float],
-        format: str
-    ) -> Tuple[List[bytes], Dict[str, Any]]:
-        """Synchronous frame extraction"""
         
-        with tempfile.NamedTemporaryFile(delete=False) as input_file:
-            input_file.write(video_data)
-            input_path = input_file.name
+        input_path, release_input = _open_source(source)
         
-        with tempfile.TemporaryDirectory() as temp_dir:
-            output_pattern = os.path.join(temp_dir, f'frame_%04d.{format}')
+        try:
+            input_args = {}
             
-            try:
-                stream = ffmpeg.input(input_path)
-                
-                # Apply time constraints
-                if start_time is not None:
-                    stream = ffmpeg.input(input_path, ss=start_time)
-                
-                output_args = {
-                    'vf': f'fps={fps}',
-                    'format': 'image2'
-                }
-                
-                if duration is not None:
-                    output_args['t'] = duration
-                
-                stream = ffmpeg.output(stream, output_pattern, **output_args)
-                ffmpeg.run(stream, overwrite_output=True, quiet=True)
-                
-                # Read all generated frames
-                frames = []
-                frame_files = sorted([f for f in os.listdir(temp_dir) if f.startswith('frame_')])
-                
-                for frame_file in frame_files:
-                    frame_path = os.path.join(temp_dir, frame_file)
-                    with open(frame_path, 'rb') as f:
-                        frames.append(f.read())
-                
-                metadata = {
-                    'frame_count': len(frames),
-                    'fps': fps,
-                    'start_time': start_time or 0,
-                    'duration': duration,
-                    'format': format,
-                    'total_size': sum(len(frame) for frame in frames)
-                }
-                
-                logger.info(f"Extracted {len(frames)} frames from video")
-                return frames, metadata
-                
-            finally:
+            # Apply time constraints
+            if start_time is not None:
+                input_args['ss'] = start_time
+            
+            # One image2pipe stream on stdout instead of a file per frame
+            output_args = {
+                'vf': f'fps={fps}',
+                'format': 'image2pipe',
+                'vcodec': _IMAGE_CODECS.get(format.lower(), 'mjpeg')
+            }
+            
+            if duration is not None:
+                output_args['t'] = duration
+            
+            image_stream = None
+            if self.hwaccel:
+                # Decode on the GPU; FFmpeg downloads each frame for the
+                # CPU fps filter and image encoder
+                hw_input_args = {**input_args, **_hwaccel_decode_args(self.hwaccel)}
                 try:
-                    os.unlink(input_path)
-                except OSError:
-                    pass
-    
-    async def get_video_info(self, video_data: bytes) -> Dict[str, Any]:
-        """Get video file metadata and information"""
-        try:
-            result = await asyncio.get_event_loop().run_in_executor(
-                self.executor,
-                self._get_video_info_sync,
-                video_data
-            )
-            return result
+                    stream = ffmpeg.output(ffmpeg.input(input_path, **hw_input_args), 'pipe:1', **output_args)
+                    image_stream, _ = ffmpeg.run(stream, quiet=True)
+                except ffmpeg.Error as e:
+                    logger.warning(f"Hardware decoding with {self.hwaccel} failed, decoding on the CPU: {e}")
             
-        except Exception as e:
-            logger.error(f"Failed to get video info: {e}")
-            raise
+            if image_stream is None:
+                stream = ffmpeg.output(ffmpeg.input(input_path, **input_args), 'pipe:1', **output_args)
+                image_stream, _ = ffmpeg.run(stream, quiet=True)
+            frames = _split_image_stream(image_stream, output_args['vcodec'])
+            
+            metadata = {
+                'frame_count': len(frames),
+                'fps': fps,
+                'start_time': start_time or 0,
+                'duration': duration,
+                'format': format,
+                'total_size': sum(len(frame) for frame in frames)
+            }
+            
+            logger.info(f"Extracted {len(frames)} frames from video")
+            return frames, metadata
+            
+        finally:
+            release_input()
     
-    def _get_video_info_sync(self, video_data: bytes) -> Dict[str, Any]:
-        """Synchronous video info extraction"""
+    @_run_in('probe_executor', "Failed to get video info")
+    def get_video_info(self, source: VideoSource) -> Dict[str, Any]:
+        """Get video file metadata and information"""
         
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            temp_file.write(video_data)
-            temp_path = temp_file.name
+        input_path, release_input = _open_source(source)
         
         try:
-            probe = ffmpeg.probe(temp_path)
+            # Plain H.264/AAC MP4s are read from their header without ffprobe
+            probe = probe_mp4(input_path) or ffmpeg.probe(input_path)
             format_info = probe['format']
             
             video_stream = next((s for s in probe['streams'] if s['codec_type'] == 'video'), None)
@@ -504,7 +892,7 @@ class VideoProcessor:
             info = {
                 'format': format_info.get('format_name', 'unknown'),
                 'duration': float(format_info.get('duration', 0)),
-                'size': int(format_info.get('size', len(video_data))),
+                'size': int(format_info.get('size', os.path.getsize(input_path))),
                 'bitrate': format_info.get('bit_rate', 'unknown'),
                 'tags': format_info.get('tags', {})
             }
@@ -529,7 +917,4 @@ class VideoProcessor:
             return info
             
         finally:
-            try:
-                os.unlink(temp_path)
-            except OSError:
-                pass
\ No newline at end of file
+            release_input()
\ No newline at end of file
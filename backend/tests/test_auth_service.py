@@ -14,13 +14,14 @@ from services.auth_service import AuthService
 class TestAuthService:
     """Test suite for AuthService."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def auth_service(self):
-        """Create AuthService instance for testing."""
+        """Create one AuthService shared by every test; tests must not mutate it."""
         return AuthService(
             secret_key="test-secret-key-for-testing-only",
             algorithm="HS256",
-            token_expire_days=7
+            token_expire_days=7,
+            bcrypt_rounds=4  # Minimum cost; same code paths, far faster hashing
         )
     
     def test_hash_password(self, auth_service):
@@ -0,0 +1,210 @@
+"""
+Unit tests for the MP4 header probe.
+
+Files are synthesized box by box so each test can change exactly the part of
+the layout it covers.
+"""
+
+import struct
+
+import pytest
+
+from services.mp4_probe import probe_mp4, _parse_sps
+
+
+def box(kind: bytes, *payload: bytes) -> bytes:
+    """Build an MP4 box with a 32-bit size."""
+    data = b''.join(payload)
+    return struct.pack('>I4s', 8 + len(data), kind) + data
+
+
+def full_box(kind: bytes, *payload: bytes) -> bytes:
+    """Build a version 0 MP4 full box (zero version and flags before the payload)."""
+    return box(kind, b'\x00' * 4, *payload)
+
+
+def ue(value: int) -> str:
+    """Exp-Golomb code for value as a bit string."""
+    code = bin(value + 1)[2:]
+    return '0' * (len(code) - 1) + code
+
+
+def build_sps(
+    width_mbs: int,
+    height_mbs: int,
+    crop_bottom: int = 0,
+    sps_id: int = 0,
+    level: int = 30
+) -> bytes:
+    """Escaped baseline-profile SPS NAL unit with optional bottom cropping."""
+    bits = '01000010' + '00000000' + format(level, '08b')  # profile 66, constraints, level
+    bits += ue(sps_id) + ue(0) + ue(2) + ue(1) + '0'  # frame_num, POC type 2, one ref frame
+    bits += ue(width_mbs - 1) + ue(height_mbs - 1) + '1' + '1'  # frame_mbs_only, direct_8x8
+    if crop_bottom:
+        bits += '1' + ue(0) + ue(0) + ue(0) + ue(crop_bottom)
+    else:
+        bits += '0'
+    bits += '0' + '1'  # No VUI, then the RBSP stop bit
+    bits += '0' * (-len(bits) % 8)
+    rbsp = int(bits, 2).to_bytes(len(bits) // 8, 'big')
+
+    # Emulation prevention: 00 00 followed by 00-03 gets an 03 inserted
+    escaped = bytearray()
+    zeros = 0
+    for byte in rbsp:
+        if zeros >= 2 and byte <= 3:
+            escaped.append(3)
+            zeros = 0
+        escaped.append(byte)
+        zeros = zeros + 1 if byte == 0 else 0
+    return b'\x67' + bytes(escaped)
+
+
+def avc1_entry(width: int, height: int, sps: bytes, kind: bytes = b'avc1') -> bytes:
+    """Video sample entry carrying an avcC with a single SPS."""
+    avcc = box(b'avcC', bytes([1, sps[1], sps[2], sps[3], 0xff, 0xe1]), struct.pack('>H', len(sps)), sps, b'\x00')
+    fields = (
+        b'\x00' * 6 + struct.pack('>H', 1) + b'\x00' * 16
+        + struct.pack('>HHIII', width, height, 0x480000, 0x480000, 0)
+        + struct.pack('>H', 1) + b'\x00' * 32 + struct.pack('>Hh', 24, -1)
+    )
+    return box(kind, fields, avcc)
+
+
+def mp4a_entry(rate_index: int = 4, channels: int = 2) -> bytes:
+    """AAC-LC sample entry with an esds descriptor chain."""
+    config = struct.pack('>H', (2 << 11) | (rate_index << 7) | (channels << 3))
+    decoder_specific = bytes([0x05, len(config)]) + config
+    decoder_config = bytes([0x04, 13 + len(decoder_specific), 0x40, 0x15]) + b'\x00' * 11 + decoder_specific
+    es_descriptor = bytes([0x03, 3 + len(decoder_config) + 3, 0, 1, 0]) + decoder_config + b'\x06\x01\x02'
+    fields = b'\x00' * 6 + struct.pack('>H', 1) + b'\x00' * 8 + struct.pack('>HHHHI', channels, 16, 0, 0, 44100 << 16)
+    return box(b'mp4a', fields, full_box(b'esds', es_descriptor))
+
+
+def trak(handler: bytes, entry: bytes, timescale: int, sample_delta: int, width: int = 0, height: int = 0) -> bytes:
+    """Track with a single sample entry and a constant-delta stts."""
+    matrix = struct.pack('>9I', 0x10000, 0, 0, 0, 0x10000, 0, 0, 0, 0x40000000)
+    tkhd = full_box(b'tkhd', b'\x00' * 36, matrix, struct.pack('>II', width << 16, height << 16))
+    mdhd = full_box(b'mdhd', struct.pack('>IIIIHH', 0, 0, timescale, timescale * 2, 0x55c4, 0))
+    hdlr = full_box(b'hdlr', b'\x00' * 4, handler, b'\x00' * 12, b'Handler\x00')
+    stbl = box(
+        b'stbl',
+        full_box(b'stsd', struct.pack('>I', 1), entry),
+        full_box(b'stts', struct.pack('>III', 1, 60, sample_delta))
+    )
+    return box(b'trak', tkhd, box(b'mdia', mdhd, hdlr, box(b'minf', stbl)))
+
+
+def build_mp4(video_entry: bytes = None, extra_moov: bytes = b'', extra_top: bytes = b'', mdat: bytes = None) -> bytes:
+    """1920x1080 30 fps H.264 + AAC file, 2 seconds long."""
+    if video_entry is None:
+        video_entry = avc1_entry(1920, 1080, build_sps(120, 68, crop_bottom=4))
+    ftyp = box(b'ftyp', b'isom', struct.pack('>I', 512), b'isomiso2avc1mp41')
+    mvhd = full_box(b'mvhd', struct.pack('>IIII', 3786912000, 0, 1000, 2000), b'\x00' * 80)
+    udta = box(b'udta', full_box(b'meta', full_box(b'hdlr', b'\x00' * 4, b'mdir', b'\x00' * 13), box(
+        b'ilst', box(b'\xa9too', box(b'data', struct.pack('>II', 1, 0), b'Lavf61.1.100'))
+    )))
+    moov = box(
+        b'moov',
+        mvhd,
+        trak(b'vide', video_entry, 15360, 512, 1920, 1080),
+        trak(b'soun', mp4a_entry(), 44100, 1024),
+        udta,
+        extra_moov
+    )
+    if mdat is None:
+        mdat = box(b'mdat', b'\x00' * 1024)
+    return ftyp + moov + extra_top + mdat
+
+
+class TestMp4Probe:
+    """Test suite for probe_mp4."""
+
+    @pytest.fixture
+    def write_mp4(self, tmp_path):
+        """Write bytes to a temporary .mp4 and return its path."""
+        def write(data: bytes) -> str:
+            path = tmp_path / 'video.mp4'
+            path.write_bytes(data)
+            return str(path)
+        return write
+
+    def test_h264_aac(self, write_mp4):
+        """Test format, streams and tags of a plain H.264 + AAC file."""
+        data = build_mp4()
+        probe = probe_mp4(write_mp4(data))
+
+        assert probe['format']['format_name'] == 'mov,mp4,m4a,3gp,3g2,mj2'
+        assert probe['format']['duration'] == '2.000000'
+        assert probe['format']['size'] == str(len(data))
+        assert probe['format']['bit_rate'] == str(len(data) * 4)
+        assert probe['format']['tags'] == {
+            'major_brand': 'isom',
+            'minor_version': '512',
+            'compatible_brands': 'isomiso2avc1mp41',
+            'creation_time': '2024-01-01T00:00:00.000000Z',
+            'encoder': 'Lavf61.1.100'
+        }
+
+        video, audio = probe['streams']
+        assert video == {
+            'codec_type': 'video',
+            'codec_name': 'h264',
+            'width': 1920,
+            'height': 1080,
+            'pix_fmt': 'yuv420p',
+            'r_frame_rate': '30/1'
+        }
+        assert audio == {'codec_type': 'audio', 'codec_name': 'aac', 'channels': 2, 'sample_rate': '44100'}
+
+    def test_sps_cropping(self):
+        """Test that frame cropping is applied to the coded size."""
+        assert _parse_sps(build_sps(120, 68))['height'] == 1088
+        assert _parse_sps(build_sps(120, 68, crop_bottom=4))['height'] == 1080
+
+    def test_sps_emulation_prevention(self):
+        """Test that emulation prevention bytes are removed before parsing."""
+        # Level 0 and a 13-bit sps_id code put 00 00 02 in the RBSP
+        sps = build_sps(40, 23, crop_bottom=4, sps_id=63, level=0)
+        assert b'\x00\x00\x03\x02' in sps
+
+        assert _parse_sps(sps)['width'] == 640
+        assert _parse_sps(sps)['height'] == 360
+
+    def test_64bit_box_size(self, write_mp4):
+        """Test that an mdat with a 64-bit size is walked correctly."""
+        payload = b'\x00' * 1024
+        mdat = struct.pack('>I4sQ', 1, b'mdat', 16 + len(payload)) + payload
+
+        assert probe_mp4(write_mp4(build_mp4(mdat=mdat))) is not None
+
+    def test_64bit_box_size_past_end(self, write_mp4):
+        """Test that a 64-bit size running past the end of the file falls back."""
+        mdat = struct.pack('>I4sQ', 1, b'mdat', 1 << 40) + b'\x00' * 1024
+
+        assert probe_mp4(write_mp4(build_mp4(mdat=mdat))) is None
+
+    def test_fragmented(self, write_mp4):
+        """Test that fragmented files are left to ffprobe."""
+        mvex = box(b'mvex', full_box(b'trex', b'\x00' * 20))
+        moof = box(b'moof', full_box(b'mfhd', struct.pack('>I', 1)))
+
+        assert probe_mp4(write_mp4(build_mp4(extra_moov=mvex))) is None
+        assert probe_mp4(write_mp4(build_mp4(extra_top=moof))) is None
+
+    def test_hevc(self, write_mp4):
+        """Test that non-H.264 video is left to ffprobe."""
+        entry = avc1_entry(1920, 1080, build_sps(120, 68, crop_bottom=4), kind=b'hvc1')
+
+        assert probe_mp4(write_mp4(build_mp4(video_entry=entry))) is None
+
+    def test_truncated(self, write_mp4):
+        """Test that a file cut off inside the moov box falls back."""
+        data = build_mp4()
+
+        assert probe_mp4(write_mp4(data[:len(data) // 2])) is None
+        assert probe_mp4(write_mp4(data[:4])) is None
+
+    def test_missing_file(self, tmp_path):
+        """Test that an unreadable path falls back."""
+        assert probe_mp4(str(tmp_path / 'missing.mp4')) is None